@@ -1,21 +1,16 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+import time
+
 import streamlit as st
-import pandas as pd
 
-from data_loader import load_tmdb_via_kagglehub, LoadResult
 from constants import PAGE_TITLE, PAGE_DESC
-from filters import build_sidebar, apply_filters
-from components import kpi_cards
-from sections import (
-    section_question_1,
-    section_question_2,
-    section_questions_hub,
-    section_eda,
-    section_leaderboard,
-)
-
 
+# Everything else (pandas, kagglehub, altair, charts) is imported inside main() so the
+# header and the loading skeleton are drawn before any heavy import runs.
+if TYPE_CHECKING:
+    from snapshot import Snapshot
 
 
 def render_header() -> None:
@@ -24,40 +19,109 @@ def render_header() -> None:
     st.caption(PAGE_DESC)
 
 
-def render_data_loader() -> LoadResult:
-    with st.expander("Data Loading (KaggleHub)", expanded=False):
+def render_skeleton():
+    """Placeholder KPI row shown while data and chart modules load; returns its container."""
+    skeleton = st.empty()
+    with skeleton.container():
+        cols = st.columns(4)
+        for col, label in zip(cols, ("Number of Movies", "Average Rating", "Median Revenue", "Median ROI")):
+            col.metric(label, "—")
+        st.caption("Loading dataset...")
+    return skeleton
+
+
+def render_data_loader() -> Snapshot:
+    import pandas as pd
+    from data_loader import LoadResult
+    from snapshot import Snapshot, get_snapshot_manager
+    from spec_cache import get_spec_cache
+
+    expander = st.expander("Data Loading (KaggleHub)", expanded=False)
+    with expander:
         st.write("The app downloads the TMDB 5000 dataset via kagglehub.")
 
+    manager = get_snapshot_manager()
     try:
-        return load_tmdb_via_kagglehub()
+        if manager.ready:
+            snap = manager.current()
+        else:
+            with st.spinner("Loading dataset..."):
+                snap = manager.current()
     except Exception:
         st.error("Unable to load data via KaggleHub. Please check network/permissions. Error details are hidden.")
         st.stop()
-        return LoadResult(df=pd.DataFrame(), source="Empty data (KaggleHub load failed)")
+        return Snapshot(0, LoadResult(df=pd.DataFrame(), source="Empty data (KaggleHub load failed)"), 0.0, 0.0)
+
+    with expander:
+        status = manager.status()
+        st.caption(f"Snapshot v{snap.version} · {snap.source} · {snap.df.shape[0]:,} rows · built in {snap.build_seconds:.1f}s")
+        if snap.shared is not None:
+            published = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snap.shared.published_at))
+            st.caption(f"Shared table version {snap.shared.version} · published {published}")
+        specs = get_spec_cache().stats()
+        st.caption(
+            f"Chart spec cache: {specs.hit_rate:.0%} hit rate ({specs.hits:,} of {specs.hits + specs.misses:,}) · "
+            f"{specs.entries} specs · {specs.nbytes / 2**20:.1f} of {specs.max_bytes / 2**20:.0f} MB"
+        )
+        if status.building:
+            st.info("A new dataset version is being built in the background; the page keeps using the current one.")
+        if status.retired_alive:
+            st.caption("Older snapshots still pinned by sessions: " + ", ".join(f"v{v}" for v in status.retired_alive))
+        if status.last_error:
+            st.warning("The last background refresh failed; still serving the current snapshot.")
+        if st.button("Refresh dataset in background", disabled=status.building):
+            manager.refresh()
+    return snap
 
 
 def main() -> None:
     render_header()
-
-    # Data loading
-    load_res = render_data_loader()
-    df_full = load_res.df
+    skeleton = render_skeleton()
+
+    from filters import build_sidebar
+    from crossfilter import build_cross_view, cross_filter_bar
+    from components import kpi_cards
+    from export import build_export_sidebar
+    from sections import (
+        section_question_1,
+        section_question_2,
+        section_questions_hub,
+        section_eda,
+        section_leaderboard,
+        section_people,
+        section_similar,
+    )
+
+    # Data loading: the snapshot is shared read-only by all sessions, so it is never copied here
+    snap = render_data_loader()
+    df_full = snap.df
+    # Pin the snapshot this session renders until its next rerun (retired snapshots stay alive while pinned)
+    st.session_state["snapshot"] = snap
     # Keep full dataset for chart fallback when no data after filters
-    st.session_state["df_full"] = df_full.copy()
+    st.session_state["df_full"] = df_full
 
     # Sidebar filters
     f = build_sidebar(df_full)
-    df_filtered = apply_filters(df_full, f)
+    # Sidebar filters plus chart selections (cross-filter); row masks are memoized per snapshot
+    view = build_cross_view(df_full, f, snap.version, shared=snap.shared)
+    build_export_sidebar(view)
+    df_filtered = view.frame()
+    # Merged partition statistics; None when the filters are not partition-only
+    moments = snap.moments.query(f) if snap.moments is not None and not view.xf else None
 
     # KPI cards
-    kpi_cards(df_filtered)
+    skeleton.empty()
+    cross_filter_bar(view.xf)
+    kpi_cards(df_filtered, moments=moments)
 
     # Analysis questions and EDA
-    section_question_1(df_filtered)
-    section_question_2(df_filtered)
-    section_questions_hub(df_filtered)
-    section_eda(df_filtered)
+    section_question_1(df_filtered, moments=moments, view=view)
+    section_question_2(df_filtered, view=view)
+    section_questions_hub(df_filtered, view=view)
+    section_eda(df_filtered, moments=moments, view=view)
     section_leaderboard(df_filtered)
+    section_people(df_filtered)
+    section_similar(df_filtered, df_full, snap.version)
 
 
 
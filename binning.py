@@ -0,0 +1,145 @@
+"""
+NumPy binning engine: fixed-width and quantile bins, per-bin statistics and five-number summaries.
+
+Charts aggregate on the server with these helpers and hand Altair one row per bin/group, so the
+chart payload no longer grows with the number of filtered movies.
+"""
+from __future__ import annotations
+
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def nice_edges(values: np.ndarray, maxbins: int = 20) -> np.ndarray:
+    """Fixed-width edges with a "nice" step (1/2/5 × 10^k), as Vega-Lite's ``bin(maxbins=...)`` picks."""
+    values = np.asarray(values, dtype="float64")
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return np.array([0.0, 1.0])
+    lo, hi = float(values.min()), float(values.max())
+    span = hi - lo
+    if span <= 0:
+        return np.array([lo, lo + 1.0])
+    level = np.ceil(np.log10(maxbins))
+    step = 10.0 ** (np.round(np.log10(span)) - level)
+    while np.ceil(span / step) > maxbins:
+        step *= 10
+    for div in (5, 2):
+        if span / (step / div) <= maxbins:
+            step /= div
+    start = np.floor(lo / step) * step
+    stop = np.ceil(hi / step) * step
+    if stop <= start:
+        stop = start + step
+    return start + step * np.arange(int(round((stop - start) / step)) + 1)
+
+
+def quantile_edges(values: np.ndarray, q: int) -> np.ndarray:
+    """Edges of ``q`` equal-frequency bins; duplicate edges are dropped like ``pd.qcut(duplicates="drop")``."""
+    values = np.asarray(values, dtype="float64")
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return np.array([0.0, 0.0])
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, max(1, q) + 1)))
+    if edges.size < 2:
+        edges = np.array([edges[0], edges[0]])
+    return edges
+
+
+def assign_bins(values: np.ndarray, edges: np.ndarray, right: bool = True) -> np.ndarray:
+    """Bin index per value (-1 for NaN/out of range).
+
+    ``right=True`` gives ``(a, b]`` bins with the first bin closed (``pd.cut(include_lowest=True)``);
+    ``right=False`` gives ``[a, b)`` bins with the last bin closed (``np.histogram``).
+    """
+    values = np.asarray(values, dtype="float64")
+    n_bins = len(edges) - 1
+    if right:
+        codes = np.searchsorted(edges, values, side="left") - 1
+        codes[values == edges[0]] = 0
+    else:
+        codes = np.searchsorted(edges, values, side="right") - 1
+        codes[values == edges[-1]] = n_bins - 1
+    codes[(codes < 0) | (codes >= n_bins) | np.isnan(values)] = -1
+    return codes
+
+
+def interval_labels(edges: np.ndarray, fmt: str = "{:,.0f}") -> List[str]:
+    """Labels for ``(a, b]`` bins, first bin written ``[a, b]``."""
+    labels = []
+    for i in range(len(edges) - 1):
+        left = "[" if i == 0 else "("
+        labels.append(f"{left}{fmt.format(edges[i])}, {fmt.format(edges[i + 1])}]")
+    return labels
+
+
+def group_quantiles(values: np.ndarray, codes: np.ndarray, n_groups: int, qs: Sequence[float]) -> np.ndarray:
+    """Linear-interpolated quantiles per group (NumPy's default method); shape ``(n_groups, len(qs))``.
+
+    Rows with ``codes < 0`` or NaN values are ignored; empty groups give NaN.
+    """
+    values = np.asarray(values, dtype="float64")
+    keep = (codes >= 0) & ~np.isnan(values)
+    v, c = values[keep], codes[keep]
+    order = np.lexsort((v, c))
+    v = v[order]
+    counts = np.bincount(c, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    out = np.full((n_groups, len(qs)), np.nan)
+    has = counts > 0
+    for k, q in enumerate(qs):
+        pos = (counts[has] - 1) * q
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.ceil(pos).astype(np.int64)
+        frac = pos - lo
+        base = starts[has]
+        out[has, k] = v[base + lo] * (1 - frac) + v[base + hi] * frac
+    return out
+
+
+def binned_stats(values: np.ndarray, codes: np.ndarray, n_groups: int) -> pd.DataFrame:
+    """Per-group count, mean, sample std (ddof=1) and median of ``values``."""
+    values = np.asarray(values, dtype="float64")
+    keep = (codes >= 0) & ~np.isnan(values)
+    v, c = values[keep], codes[keep]
+    n = np.bincount(c, minlength=n_groups).astype("float64")
+    s = np.bincount(c, weights=v, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s / n
+        dev = v - mean[c]
+        var = np.bincount(c, weights=dev * dev, minlength=n_groups) / (n - 1)
+    var[n < 2] = np.nan
+    return pd.DataFrame({
+        "n": n.astype(np.int64),
+        "mean": mean,
+        "std": np.sqrt(var),
+        "median": group_quantiles(values, codes, n_groups, [0.5])[:, 0],
+    })
+
+
+def five_number_summary(values: np.ndarray, codes: np.ndarray, n_groups: int, whisker: float = 1.5) -> pd.DataFrame:
+    """Box-plot summary per group: min, q1, median, q3, max and whisker ends.
+
+    Whiskers reach the most extreme values within ``whisker`` × IQR of the box, like Vega-Lite's
+    default ``boxplot`` extent.
+    """
+    values = np.asarray(values, dtype="float64")
+    quart = group_quantiles(values, codes, n_groups, [0.0, 0.25, 0.5, 0.75, 1.0])
+    out = pd.DataFrame(quart, columns=["min", "q1", "median", "q3", "max"])
+    iqr = out["q3"].to_numpy() - out["q1"].to_numpy()
+    lo_fence = out["q1"].to_numpy() - whisker * iqr
+    hi_fence = out["q3"].to_numpy() + whisker * iqr
+
+    keep = (codes >= 0) & ~np.isnan(values)
+    v, c = values[keep], codes[keep]
+    inside = (v >= lo_fence[c]) & (v <= hi_fence[c])
+    lower = np.full(n_groups, np.inf)
+    upper = np.full(n_groups, -np.inf)
+    np.minimum.at(lower, c[inside], v[inside])
+    np.maximum.at(upper, c[inside], v[inside])
+    out["lower"] = np.where(np.isfinite(lower), lower, np.nan)
+    out["upper"] = np.where(np.isfinite(upper), upper, np.nan)
+    out["n"] = np.bincount(c, minlength=n_groups)
+    return out
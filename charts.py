@@ -1,9 +1,24 @@
 from __future__ import annotations
 
-import re
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 import altair as alt
 
+from binning import (
+    assign_bins,
+    binned_stats,
+    five_number_summary,
+    interval_labels,
+    nice_edges,
+    quantile_edges,
+)
+from derived import derived_column, with_derived
+
+# Numeric features shown in the correlation heatmap
+CORR_COLUMNS = ["budget", "revenue", "runtime", "popularity", "vote_average", "vote_count", "profit", "roi"]
+
 
 def chart_budget_vs_revenue(df: pd.DataFrame) -> alt.Chart:
     base = alt.Chart(df).mark_circle(opacity=0.6).encode(
@@ -98,8 +113,7 @@ def chart_company_roi(df: pd.DataFrame, top_k: int = 15, min_count: int = 20) ->
 
 
 def chart_genre_share_by_decade(df: pd.DataFrame, top_n_genres: int = 6) -> alt.Chart:
-    sub = df.dropna(subset=["release_year"]).copy()
-    sub["decade"] = (sub["release_year"] // 10 * 10).astype("Int64")
+    sub = pd.DataFrame({"decade": derived_column(df, "decade"), "genres_list": df["genres_list"]}).dropna(subset=["decade"])
     exploded = sub.explode("genres_list")
     counts = exploded.groupby("genres_list").size().sort_values(ascending=False).head(top_n_genres)
     top_genres = set(counts.index.tolist())
@@ -120,15 +134,22 @@ def chart_genre_share_by_decade(df: pd.DataFrame, top_n_genres: int = 6) -> alt.
     )
 
 
-def chart_genre_roi(df: pd.DataFrame, top_k: int = 10) -> alt.Chart:
+def genre_roi_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Movie count and median ROI per genre."""
     exploded = df.explode("genres_list")
-    grp = (
+    return (
         exploded.groupby("genres_list", dropna=True)
         .agg(count=("id", "count"), median_roi=("roi", "median"))
         .reset_index()
         .dropna(subset=["genres_list"])
     )
+
+
+def chart_genre_roi(df: pd.DataFrame, top_k: int = 10, stats: Optional[pd.DataFrame] = None) -> alt.Chart:
+    """Median ROI by genre; clicking bars selects genres (point selection ``genre_pick``)."""
+    grp = genre_roi_stats(df) if stats is None else stats
     top = grp.sort_values("median_roi", ascending=False).head(top_k)
+    pick = alt.selection_point(name="genre_pick", fields=["genres_list"])
     return (
         alt.Chart(top)
         .mark_bar()
@@ -136,13 +157,14 @@ def chart_genre_roi(df: pd.DataFrame, top_k: int = 10) -> alt.Chart:
             x=alt.X("median_roi:Q", title="Median ROI"),
             y=alt.Y("genres_list:N", sort="-x", title="Genre"),
             color=alt.Color("median_roi:Q", scale=alt.Scale(scheme="greens"), legend=None),
+            opacity=alt.condition(pick, alt.value(1.0), alt.value(0.35)),
             tooltip=["genres_list", alt.Tooltip("count", title="Count"), alt.Tooltip("median_roi", format=".2f")],
         )
+        .add_params(pick)
         .properties(height=30 * len(top))
     )
 
 
-
 def chart_runtime_vote_loess_facet(df: pd.DataFrame, top_k: int = 4) -> alt.Chart:
     sub = df.dropna(subset=["runtime", "vote_average"]).explode("genres_list")
     counts = sub.groupby("genres_list").size().sort_values(ascending=False).head(top_k)
@@ -153,10 +175,8 @@ def chart_runtime_vote_loess_facet(df: pd.DataFrame, top_k: int = 4) -> alt.Char
 
 
 def chart_tag_count_relation(df: pd.DataFrame, target: str = "vote") -> alt.Chart:
-    sub = df.copy()
-    sub["tag_count"] = df["genres_list"].apply(lambda x: len(x or []))
     y_col = "vote_average" if target == "vote" else "roi"
-    sub = sub.dropna(subset=[y_col])
+    sub = with_derived(df, ["tag_count"]).dropna(subset=[y_col])[["title", "tag_count", "popularity", y_col]]
     base = alt.Chart(sub).mark_circle(opacity=0.5).encode(
         x=alt.X("tag_count:Q", title="Genre tag count"),
         y=alt.Y(f"{y_col}:Q", title="Rating" if target == "vote" else "ROI"),
@@ -167,21 +187,36 @@ def chart_tag_count_relation(df: pd.DataFrame, target: str = "vote") -> alt.Char
     return (base + reg).properties(height=360)
 
 
-def chart_country_language_heat(df: pd.DataFrame, metric: str = "roi", min_count: int = 10, top_c: int = 15, top_l: int = 10) -> alt.Chart:
-    if "production_countries_list" not in df.columns or "original_language" not in df.columns:
-        return alt.Chart(pd.DataFrame({"x": [], "y": [], "v": []})).mark_rect()
+def country_language_stats(df: pd.DataFrame, metric: str = "roi", min_count: int = 10, top_c: int = 15, top_l: int = 10) -> pd.DataFrame:
+    """Count and median ``metric`` per (country, language) cell among the top countries/languages."""
     exploded = df.explode("production_countries_list").dropna(subset=["production_countries_list", "original_language"])
     grp = exploded.groupby(["production_countries_list", "original_language"]).agg(n=("id", "count"), v=(metric, "median")).reset_index()
     top_countries = grp.groupby("production_countries_list")["n"].sum().sort_values(ascending=False).head(top_c).index
     top_langs = grp.groupby("original_language")["n"].sum().sort_values(ascending=False).head(top_l).index
-    use = grp[(grp["n"] >= min_count) & grp["production_countries_list"].isin(top_countries) & grp["original_language"].isin(top_langs)]
+    return grp[(grp["n"] >= min_count) & grp["production_countries_list"].isin(top_countries) & grp["original_language"].isin(top_langs)]
+
+
+def chart_country_language_heat(
+    df: pd.DataFrame,
+    metric: str = "roi",
+    min_count: int = 10,
+    top_c: int = 15,
+    top_l: int = 10,
+    stats: Optional[pd.DataFrame] = None,
+) -> alt.Chart:
+    """Country × language heatmap; clicking cells selects them (point selection ``cell_pick``)."""
+    if "production_countries_list" not in df.columns or "original_language" not in df.columns:
+        return alt.Chart(pd.DataFrame({"x": [], "y": [], "v": []})).mark_rect()
+    use = country_language_stats(df, metric, min_count, top_c, top_l) if stats is None else stats
+    pick = alt.selection_point(name="cell_pick", fields=["production_countries_list", "original_language"])
     title_map = {"roi": "Median ROI", "revenue": "Median Revenue"}
     return alt.Chart(use).mark_rect().encode(
         x=alt.X("original_language:N", title="Language"),
         y=alt.Y("production_countries_list:N", title="Country"),
         color=alt.Color("v:Q", title=title_map.get(metric, metric), scale=alt.Scale(scheme="redblue")),
+        opacity=alt.condition(pick, alt.value(1.0), alt.value(0.35)),
         tooltip=["production_countries_list", "original_language", alt.Tooltip("v", format=".2f"), alt.Tooltip("n", title="Count")],
-    ).properties(height=26 * use["production_countries_list"].nunique() if not use.empty else 200)
+    ).add_params(pick).properties(height=26 * use["production_countries_list"].nunique() if not use.empty else 200)
 
 
  
@@ -193,18 +228,14 @@ def chart_country_language_heat(df: pd.DataFrame, metric: str = "roi", min_count
 def chart_month_seasonality(df: pd.DataFrame) -> alt.VConcatChart:
     if "release_date" not in df.columns:
         return alt.vconcat()
-    sub = df.dropna(subset=["release_date"]).copy()
-    sub["month"] = sub["release_date"].dt.month
-    grp = sub.groupby("month").agg(avg_rev=("revenue", "mean"), avg_vote=("vote_average", "mean")).reset_index()
+    grp = df.groupby(derived_column(df, "month")).agg(avg_rev=("revenue", "mean"), avg_vote=("vote_average", "mean")).reset_index()
     bar_rev = alt.Chart(grp).mark_bar(color="#2ca02c").encode(x=alt.X("month:O", title="Month"), y=alt.Y("avg_rev:Q", title="Average revenue", axis=alt.Axis(format="~s")))
     bar_vote = alt.Chart(grp).mark_bar(color="#1f77b4").encode(x=alt.X("month:O", title="Month"), y=alt.Y("avg_vote:Q", title="Average rating"))
     return alt.vconcat(bar_rev.properties(height=260), bar_vote.properties(height=220))
 
 
 def chart_decade_multi_trend(df: pd.DataFrame) -> alt.Chart:
-    sub = df.dropna(subset=["release_year"]).copy()
-    sub["decade"] = (sub["release_year"] // 10 * 10).astype("Int64")
-    grp = sub.groupby("decade").agg(avg_budget=("budget", "mean"), avg_revenue=("revenue", "mean"), avg_vote=("vote_average", "mean")).reset_index()
+    grp = df.groupby(derived_column(df, "decade")).agg(avg_budget=("budget", "mean"), avg_revenue=("revenue", "mean"), avg_vote=("vote_average", "mean")).reset_index()
     tidy = grp.melt(id_vars=["decade"], var_name="metric", value_name="value")
     return alt.Chart(tidy).mark_line(point=True).encode(
         x=alt.X("decade:O", title="Decade"), y=alt.Y("value:Q", title=None), color=alt.Color("metric:N", title="Metric"), tooltip=["decade", alt.Tooltip("value", format="~s")]
@@ -227,8 +258,14 @@ def chart_budget_bin_roi_turning(df: pd.DataFrame, bins: int = 8) -> alt.Chart:
     sub = df.dropna(subset=["budget_clip", "roi"]).query("budget_clip > 0")
     if sub.empty:
         return alt.Chart(pd.DataFrame()).mark_line()
-    b = pd.qcut(sub["budget_clip"], q=min(bins, sub.shape[0]), duplicates="drop")
-    agg = sub.assign(bin=b.astype(str)).groupby("bin").agg(med_roi=("roi", "median"), x=("budget_clip", "median"), n=("id", "count")).reset_index()
+    budget = sub["budget_clip"].to_numpy(dtype="float64")
+    edges = quantile_edges(budget, min(bins, sub.shape[0]))
+    codes = assign_bins(budget, edges)
+    n_bins = len(edges) - 1
+    stats = binned_stats(sub["roi"].to_numpy(dtype="float64"), codes, n_bins)
+    x = binned_stats(budget, codes, n_bins)["median"]
+    agg = pd.DataFrame({"bin": interval_labels(edges), "med_roi": stats["median"], "x": x, "n": stats["n"]})
+    agg = agg[agg["n"] > 0].reset_index(drop=True)
     peak_idx = agg["med_roi"].idxmax()
     peak = agg.loc[[peak_idx]]
     line = alt.Chart(agg).mark_line(point=True, color="#1f77b4").encode(
@@ -296,11 +333,8 @@ def chart_country_language_facet_bar(df: pd.DataFrame, metric: str = "roi", min_
 def chart_month_seasonality_heat(df: pd.DataFrame, metric: str = "revenue") -> alt.Chart:
     if "release_date" not in df.columns:
         return alt.Chart(pd.DataFrame()).mark_rect()
-    sub = df.dropna(subset=["release_date"]).copy()
-    sub["month"] = sub["release_date"].dt.month
-    sub["decade"] = (sub["release_date"].dt.year // 10 * 10).astype("Int64")
-    y_col = metric if metric in sub.columns else "revenue"
-    grp = sub.groupby(["decade", "month"]).agg(v=(y_col, "mean")).reset_index()
+    y_col = metric if metric in df.columns else "revenue"
+    grp = df.groupby([derived_column(df, "decade"), derived_column(df, "month")]).agg(v=(y_col, "mean")).reset_index()
     title = "Average revenue" if y_col == "revenue" else "Average rating"
     return (
         alt.Chart(grp)
@@ -316,11 +350,10 @@ def chart_month_seasonality_heat(df: pd.DataFrame, metric: str = "revenue") -> a
 
 
 def chart_sequel_original_bar(df: pd.DataFrame, metric: str = "roi") -> alt.Chart:
-    sub = df.copy()
-    patt = re.compile(r"(\bPart\b|\bChapter\b|\bII\b|\bIII\b|\bIV\b|\bV\b|\bVI\b|\bVII\b|\bVIII\b|\bIX\b|\bX\b|\b2\b|\b3\b|\b4\b|\b5\b)", re.IGNORECASE)
-    sub["tag"] = sub["title"].astype(str).apply(lambda s: "Sequel" if patt.search(s) else "Original")
-    y_col = metric if metric in sub.columns else "roi"
-    grp = sub.dropna(subset=[y_col]).groupby("tag").agg(med=("roi" if y_col == "roi" else y_col, "median"), n=("id", "count")).reset_index()
+    y_col = metric if metric in df.columns else "roi"
+    sub = df.dropna(subset=[y_col])
+    tag = derived_column(sub, "sequel_tag").rename("tag")
+    grp = sub.groupby(tag, observed=True).agg(med=("roi" if y_col == "roi" else y_col, "median"), n=("id", "count")).reset_index()
     return (
         alt.Chart(grp)
         .mark_bar()
@@ -335,13 +368,18 @@ def chart_sequel_original_bar(df: pd.DataFrame, metric: str = "roi") -> alt.Char
 
 
 def chart_vote_count_stability_line(df: pd.DataFrame, bins: int = 6) -> alt.Chart:
-    sub = df.dropna(subset=["vote_count", "vote_average"]).copy()
+    sub = df.dropna(subset=["vote_count", "vote_average"])
     if sub.empty:
         return alt.Chart(pd.DataFrame()).mark_line()
-    q = pd.qcut(sub["vote_count"], q=min(bins, sub.shape[0]), duplicates="drop")
-    agg = sub.assign(b=q.astype(str)).groupby("b").agg(mean=("vote_average", "mean"), std=("vote_average", "std")).reset_index()
-    line = alt.Chart(agg).mark_line(point=True, color="#1f77b4").encode(x=alt.X("b:N", title="Vote count bins"), y=alt.Y("mean:Q", title="Mean rating"))
-    band = alt.Chart(agg.assign(lo=agg["mean"] - agg["std"].fillna(0), hi=agg["mean"] + agg["std"].fillna(0))).mark_errorband(color="#aec7e8").encode(x="b:N", y="lo:Q", y2="hi:Q")
+    vote_count = sub["vote_count"].to_numpy(dtype="float64")
+    edges = quantile_edges(vote_count, min(bins, sub.shape[0]))
+    codes = assign_bins(vote_count, edges)
+    stats = binned_stats(sub["vote_average"].to_numpy(dtype="float64"), codes, len(edges) - 1)
+    agg = stats.assign(b=interval_labels(edges))
+    agg = agg[agg["n"] > 0]
+    order = agg["b"].tolist()
+    line = alt.Chart(agg).mark_line(point=True, color="#1f77b4").encode(x=alt.X("b:N", title="Vote count bins", sort=order), y=alt.Y("mean:Q", title="Mean rating"))
+    band = alt.Chart(agg.assign(lo=agg["mean"] - agg["std"].fillna(0), hi=agg["mean"] + agg["std"].fillna(0))).mark_errorband(color="#aec7e8").encode(x=alt.X("b:N", sort=order), y="lo:Q", y2="hi:Q")
     return (band + line).properties(height=300)
 
 
@@ -394,11 +432,21 @@ def chart_roi_profile_radar(df: pd.DataFrame, k: int = 30) -> alt.Chart:
 
 
 def chart_vote_hist(df: pd.DataFrame) -> alt.Chart:
-    """Histogram: rating distribution."""
+    """Histogram: rating distribution (binned on the server, one row per bin)."""
+    votes = df["vote_average"].to_numpy(dtype="float64")
+    edges = nice_edges(votes, maxbins=20)
+    codes = assign_bins(votes, edges, right=False)
+    counts = np.bincount(codes[codes >= 0], minlength=len(edges) - 1)
+    hist = pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
     return (
-        alt.Chart(df)
+        alt.Chart(hist)
         .mark_bar()
-        .encode(x=alt.X("vote_average:Q", bin=alt.Bin(maxbins=20), title="Rating"), y="count()")
+        .encode(
+            x=alt.X("bin_start:Q", title="Rating", bin="binned"),
+            x2="bin_end:Q",
+            y=alt.Y("count:Q", title="Count of Records"),
+            tooltip=[alt.Tooltip("bin_start", title="From"), alt.Tooltip("bin_end", title="To"), "count"],
+        )
         .properties(height=280)
     )
 
@@ -424,33 +472,36 @@ def chart_year_trend(df: pd.DataFrame) -> alt.Chart:
 
 
 def chart_runtime_box_by_genre(df: pd.DataFrame, top_k: int = 10) -> alt.Chart:
-    """Box plot: runtime distribution of popular genres."""
+    """Box plot: runtime distribution of popular genres (five-number summaries computed on the server)."""
     exploded = df.explode("genres_list")
     counts = exploded.groupby("genres_list").size().reset_index(name="n").sort_values("n", ascending=False)
     top_genres = counts.head(top_k)["genres_list"].tolist()
     sub = exploded[exploded["genres_list"].isin(top_genres)].dropna(subset=["runtime"])
-    return (
-        alt.Chart(sub)
-        .mark_boxplot()
-        .encode(
-            x=alt.X("runtime:Q", title="Runtime (minutes)"),
-            y=alt.Y("genres_list:N", sort="-x", title="Genre"),
-            color=alt.value("#6baed6"),
-        )
-        .properties(height=30 * len(top_genres))
-    )
+    codes = pd.Categorical(sub["genres_list"], categories=top_genres).codes.astype(np.int64)
+    box = five_number_summary(sub["runtime"].to_numpy(dtype="float64"), codes, len(top_genres))
+    box.insert(0, "genres_list", top_genres)
+    box = box[box["n"] > 0]
+    y = alt.Y("genres_list:N", sort=alt.EncodingSortField("median", order="descending"), title="Genre")
+    tooltip = [
+        "genres_list", alt.Tooltip("n", title="Count"), alt.Tooltip("lower", title="Lower whisker"),
+        alt.Tooltip("q1", title="Q1"), alt.Tooltip("median", title="Median"), alt.Tooltip("q3", title="Q3"),
+        alt.Tooltip("upper", title="Upper whisker"),
+    ]
+    base = alt.Chart(box).encode(y=y, tooltip=tooltip)
+    whiskers = base.mark_rule(color="#6baed6").encode(x=alt.X("lower:Q", title="Runtime (minutes)"), x2="upper:Q")
+    boxes = base.mark_bar(color="#6baed6", size=14).encode(x="q1:Q", x2="q3:Q")
+    medians = base.mark_tick(color="white", size=14, thickness=2).encode(x="median:Q")
+    return (whiskers + boxes + medians).properties(height=30 * len(top_genres))
 
 
-def chart_corr_heatmap(df: pd.DataFrame) -> alt.Chart:
-    """Heatmap: correlation among numerical features."""
-    num_cols = [
-        c for c in [
-            "budget", "revenue", "runtime", "popularity", "vote_average", "vote_count", "profit", "roi"
-        ] if c in df.columns
-    ]
+def chart_corr_heatmap(df: pd.DataFrame, corr_matrix: Optional[pd.DataFrame] = None) -> alt.Chart:
+    """Heatmap: correlation among numerical features (``corr_matrix`` skips the row scan)."""
+    num_cols = [c for c in CORR_COLUMNS if c in df.columns]
     if len(num_cols) < 2:
         return alt.Chart(pd.DataFrame({"x": [], "y": [], "corr": []})).mark_rect()
-    corr = df[num_cols].corr().stack().rename("corr").reset_index().rename(columns={"level_0": "x", "level_1": "y"})
+    if corr_matrix is None:
+        corr_matrix = df[num_cols].corr()
+    corr = corr_matrix.stack().rename("corr").reset_index().rename(columns={"level_0": "x", "level_1": "y"})
     return (
         alt.Chart(corr)
         .mark_rect()
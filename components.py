@@ -1,13 +1,21 @@
 from __future__ import annotations
 
 import math
+from typing import Optional
+
 import pandas as pd
 import streamlit as st
 
+from moments import Moments
+
 
-def kpi_cards(df: pd.DataFrame) -> None:
-    n_movies = int(df.shape[0])
-    avg_vote = float(df["vote_average"].mean()) if n_movies else math.nan
+def kpi_cards(df: pd.DataFrame, moments: Optional[Moments] = None) -> None:
+    if moments is not None:
+        n_movies = moments.n_rows
+        avg_vote = moments.mean("vote_average") if n_movies else math.nan
+    else:
+        n_movies = int(df.shape[0])
+        avg_vote = float(df["vote_average"].mean()) if n_movies else math.nan
     med_rev = float(df["revenue"].median()) if n_movies else math.nan
     med_roi = float(df["roi"].median()) if n_movies else math.nan
 
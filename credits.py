@@ -0,0 +1,212 @@
+"""
+Credits subsystem: cast/crew of ``tmdb_5000_credits.csv`` as person → movie-id inverted indexes.
+
+Nothing is read at import time. The index is parsed on first use, kept in ``st.cache_resource``
+and saved as ``.npz`` next to other app caches so later starts skip the JSON parsing.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+ROLES = ("director", "cast")
+ROLE_LABELS = {"director": "Director", "cast": "Actor"}
+CACHE_DIR = os.environ.get("TMDB_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "tmdb_streamlit"))
+_CACHE_FORMAT = 1
+# People listed by the person picker at once; others are found through its search box
+PERSON_OPTIONS = 50
+
+
+@dataclass
+class CreditsIndex:
+    """Integer-coded people and CSR postings (``indptr``/``movies``) per role.
+
+    Person codes are positions in ``person_ids`` (sorted TMDB person ids); the postings of code ``c``
+    are ``movies[indptr[c]:indptr[c + 1]]`` (sorted TMDB movie ids).
+    """
+    person_ids: np.ndarray
+    person_names: np.ndarray
+    cast_indptr: np.ndarray
+    cast_movies: np.ndarray
+    director_indptr: np.ndarray
+    director_movies: np.ndarray
+
+    def postings(self, role: str) -> Tuple[np.ndarray, np.ndarray]:
+        if role == "director":
+            return self.director_indptr, self.director_movies
+        return self.cast_indptr, self.cast_movies
+
+    def code_of(self, person_id: int) -> Optional[int]:
+        pos = int(np.searchsorted(self.person_ids, person_id))
+        if pos < len(self.person_ids) and self.person_ids[pos] == person_id:
+            return pos
+        return None
+
+    def name_of(self, person_id: int) -> str:
+        code = self.code_of(person_id)
+        return str(self.person_names[code]) if code is not None else str(person_id)
+
+    def movies_for(self, person_id: int, role: str) -> np.ndarray:
+        code = self.code_of(person_id)
+        if code is None:
+            return np.empty(0, dtype=np.int32)
+        indptr, movies = self.postings(role)
+        return movies[indptr[code]:indptr[code + 1]]
+
+    def ranked_people(self, role: str, min_movies: int = 1) -> np.ndarray:
+        """TMDB person ids with at least ``min_movies`` credits in ``role``, most credited first."""
+        indptr, _ = self.postings(role)
+        counts = np.diff(indptr)
+        codes = np.flatnonzero(counts >= min_movies)
+        codes = codes[np.argsort(-counts[codes], kind="stable")]
+        return self.person_ids[codes]
+
+
+# ------------------------------
+# Parsing and index construction
+# ------------------------------
+def _csr(codes: np.ndarray, movie_ids: np.ndarray, n_people: int) -> Tuple[np.ndarray, np.ndarray]:
+    pairs = np.unique(np.stack([codes, movie_ids]), axis=1) if len(codes) else np.empty((2, 0), dtype=np.int64)
+    indptr = np.zeros(n_people + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pairs[0], minlength=n_people), out=indptr[1:])
+    return indptr, pairs[1].astype(np.int32)
+
+
+def build_credits_index(raw: pd.DataFrame) -> CreditsIndex:
+    """Parse the ``cast``/``crew`` JSON columns of the credits CSV into a ``CreditsIndex``."""
+    names: Dict[int, str] = {}
+    cast_pairs: List[Tuple[int, int]] = []
+    director_pairs: List[Tuple[int, int]] = []
+    for movie_id, cast, crew in zip(raw["movie_id"], raw["cast"], raw["crew"]):
+        try:
+            cast_items = json.loads(cast) if isinstance(cast, str) else []
+            crew_items = json.loads(crew) if isinstance(crew, str) else []
+        except ValueError:
+            continue
+        for d in cast_items:
+            names.setdefault(d["id"], d.get("name", ""))
+            cast_pairs.append((d["id"], movie_id))
+        for d in crew_items:
+            if d.get("job") == "Director":
+                names.setdefault(d["id"], d.get("name", ""))
+                director_pairs.append((d["id"], movie_id))
+
+    person_ids = np.array(sorted(names), dtype=np.int64)
+    person_names = np.array([names[p] for p in person_ids], dtype=str)
+
+    def postings(pairs: List[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        arr = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        return _csr(np.searchsorted(person_ids, arr[:, 0]), arr[:, 1], len(person_ids))
+
+    cast_indptr, cast_movies = postings(cast_pairs)
+    director_indptr, director_movies = postings(director_pairs)
+    return CreditsIndex(
+        person_ids=person_ids,
+        person_names=person_names,
+        cast_indptr=cast_indptr,
+        cast_movies=cast_movies,
+        director_indptr=director_indptr,
+        director_movies=director_movies,
+    )
+
+
+# ------------------------------
+# Loading: disk cache, then CSV
+# ------------------------------
+def _cache_path(csv_path: str) -> str:
+    stat = os.stat(csv_path)
+    return os.path.join(CACHE_DIR, f"credits_v{_CACHE_FORMAT}_{stat.st_size}_{int(stat.st_mtime)}.npz")
+
+
+def _save_index(index: CreditsIndex, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, **index.__dict__)
+    os.replace(tmp, path)
+
+
+def _read_index(path: str) -> CreditsIndex:
+    with np.load(path, allow_pickle=False) as z:
+        return CreditsIndex(**{k: z[k] for k in z.files})
+
+
+def find_credits_csv(data_dir: str) -> Optional[str]:
+    candidates = (
+        os.path.join(data_dir, "tmdb_5000_credits.csv"),
+        os.path.join(data_dir, "tmdb_5000_credits_2.csv"),
+    )
+    return next((p for p in candidates if os.path.exists(p)), None)
+
+
+def load_credits_from_csv(csv_path: str) -> CreditsIndex:
+    """Read the on-disk index for ``csv_path`` if present, else parse the CSV and save it."""
+    cache_path = _cache_path(csv_path)
+    if os.path.exists(cache_path):
+        try:
+            return _read_index(cache_path)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    index = build_credits_index(pd.read_csv(csv_path, usecols=["movie_id", "cast", "crew"]))
+    try:
+        _save_index(index, cache_path)
+    except OSError:
+        pass
+    return index
+
+
+@st.cache_resource(show_spinner="Loading credits (cast/crew)...")
+def load_credits_index() -> CreditsIndex:
+    """Credits index of the dataset; loaded once per process on first use.
+
+    Raises ``FileNotFoundError`` when the credits CSV is missing (it is optional with ``TMDB_DATA_DIR``)
+    and whatever kagglehub raises when the download fails.
+    """
+    from data_loader import dataset_dir
+
+    csv_path = find_credits_csv(dataset_dir())
+    if not csv_path:
+        raise FileNotFoundError("tmdb_5000_credits.csv not found in the dataset directory (TMDB_DATA_DIR or kagglehub download)")
+    return load_credits_from_csv(csv_path)
+
+
+@st.cache_resource(show_spinner=False)
+def _ranked_names(role: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Person ids of ``role`` (most credited first), their names and lower-cased names (built once)."""
+    index = load_credits_index()
+    ids = index.ranked_people(role)
+    names = index.person_names[np.searchsorted(index.person_ids, ids)]
+    names = np.where(names == "", ids.astype(str), names)
+    return ids, names, np.char.lower(names)
+
+
+def person_options(role: str, query: str = "", limit: int = PERSON_OPTIONS) -> Dict[int, str]:
+    """Person picker options: up to ``limit`` people whose name contains ``query``, most credited first."""
+    ids, names, lower = _ranked_names(role)
+    query = query.strip().lower()
+    hits = np.flatnonzero(np.char.find(lower, query) >= 0)[:limit] if query else np.arange(min(limit, len(ids)))
+    return dict(zip(ids[hits].tolist(), names[hits].tolist()))
+
+
+# ------------------------------
+# Analytics
+# ------------------------------
+def person_roi_leaderboard(
+    df: pd.DataFrame, index: CreditsIndex, role: str, min_movies: int = 3, top_k: int = 20
+) -> pd.DataFrame:
+    """Median ROI per person over the movies of ``df`` (people with at least ``min_movies`` of them)."""
+    indptr, movies = index.postings(role)
+    codes = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    roi = df.dropna(subset=["roi"]).drop_duplicates("id").set_index("id")["roi"]
+    pos = roi.index.get_indexer(movies)
+    keep = pos >= 0
+    pairs = pd.DataFrame({"code": codes[keep], "roi": roi.to_numpy()[pos[keep]]})
+    grp = pairs.groupby("code")["roi"].agg(movies="count", median_roi="median", mean_roi="mean").reset_index()
+    grp = grp[grp["movies"] >= min_movies].sort_values(["median_roi", "movies"], ascending=False).head(top_k)
+    grp.insert(0, "name", index.person_names[grp["code"].to_numpy()])
+    return grp.drop(columns=["code"]).reset_index(drop=True)
@@ -0,0 +1,211 @@
+"""
+Cross-filtering from chart selections.
+
+Clicking bars in the Question 2 genre chart or cells in the Question Hub country × language heatmap
+selects them. The chart's ``on_select`` callback copies the selection into session state, and every
+other section is re-sliced to it. The copy outlives the chart's own widget state, which Streamlit
+drops whenever the chart is not drawn (e.g. another Question Hub chart is shown), and is reset only by
+"Clear chart selections". The chart that owns a selection is drawn without it, so its other marks
+stay visible and clickable.
+
+Aggregates and row masks are memoized per (snapshot version, sidebar filters, cross-filter, name,
+params) in a process-wide LRU. A click therefore only recomputes what the new selection changes; the
+source chart and the sidebar mask come from the memo.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from derived import list_len
+from filters import Filters, filter_mask, filters_key
+from lru import LRUCache
+
+if TYPE_CHECKING:
+    from shared_table import SharedTable
+
+# Selection sources: Vega-Lite parameter name and the fields it selects on
+GENRE = "genre"
+COUNTRY_LANGUAGE = "country_language"
+SELECTION_PARAMS = {GENRE: "genre_pick", COUNTRY_LANGUAGE: "cell_pick"}
+SELECTION_FIELDS = {
+    GENRE: ("genres_list",),
+    COUNTRY_LANGUAGE: ("production_countries_list", "original_language"),
+}
+# Columns read by ``cross_filter_mask``
+MASK_COLUMNS = [c for fields in SELECTION_FIELDS.values() for c in fields]
+# Session-state keys holding the last selection of each source
+SELECTION_STATE = {GENRE: "xf_sel_genre", COUNTRY_LANGUAGE: "xf_sel_country_language"}
+MEMO_MAX_ENTRIES = 256
+MEMO_MAX_BYTES = 256 * 1024 * 1024
+_NONCE_KEY = "xf_nonce"
+
+
+@dataclass(frozen=True)
+class CrossFilter:
+    """Current chart selections; empty tuples mean "no selection"."""
+    genres: Tuple[str, ...] = ()
+    cells: Tuple[Tuple[str, str], ...] = ()   # (country, language)
+
+    def __bool__(self) -> bool:
+        return bool(self.genres or self.cells)
+
+    def without(self, source: Optional[str]) -> "CrossFilter":
+        """This cross-filter minus the selection owned by ``source``."""
+        if source == GENRE:
+            return CrossFilter(cells=self.cells)
+        if source == COUNTRY_LANGUAGE:
+            return CrossFilter(genres=self.genres)
+        return self
+
+    def describe(self) -> str:
+        parts = []
+        if self.genres:
+            parts.append("Genre: " + ", ".join(self.genres))
+        if self.cells:
+            parts.append("Country × Language: " + ", ".join(f"{c} / {l}" for c, l in self.cells))
+        return " · ".join(parts)
+
+
+def chart_key(source: str) -> str:
+    """Widget key of the chart owning ``source``; changes when selections are cleared."""
+    return f"xf_{source}_{st.session_state.get(_NONCE_KEY, 0)}"
+
+
+def _widget_selection(source: str) -> Tuple[Tuple[str, ...], ...]:
+    state = st.session_state.get(chart_key(source))
+    if not state:
+        return ()
+    points = state.get("selection", {}).get(SELECTION_PARAMS[source]) or []
+    fields = SELECTION_FIELDS[source]
+    out = {tuple(str(p[f]) for f in fields) for p in points if all(p.get(f) is not None for f in fields)}
+    return tuple(sorted(out))
+
+
+def on_chart_select(source: str) -> Callable[[], None]:
+    """``on_select`` callback for the chart owning ``source``: store its new selection."""
+    def store() -> None:
+        st.session_state[SELECTION_STATE[source]] = _widget_selection(source)
+
+    return store
+
+
+def _selected(source: str) -> Tuple[Tuple[str, ...], ...]:
+    return st.session_state.get(SELECTION_STATE[source], ())
+
+
+def read_cross_filter() -> CrossFilter:
+    """Selections stored by the charts' ``on_select`` callbacks."""
+    return CrossFilter(
+        genres=tuple(g for (g,) in _selected(GENRE)),
+        cells=tuple((c, l) for c, l in _selected(COUNTRY_LANGUAGE)),
+    )
+
+
+def clear_cross_filter() -> None:
+    for key in SELECTION_STATE.values():
+        st.session_state.pop(key, None)
+    # Chart selection state is read-only; a new key gives the charts fresh, empty state
+    st.session_state[_NONCE_KEY] = st.session_state.get(_NONCE_KEY, 0) + 1
+
+
+def cross_filter_bar(xf: CrossFilter) -> None:
+    """Active selections with a button to clear them (nothing when no selection)."""
+    if not xf:
+        return
+    c1, c2 = st.columns([5, 1])
+    c1.info(f"Cross-filter from charts: {xf.describe()}")
+    c2.button("Clear chart selections", on_click=clear_cross_filter)
+
+
+def cross_filter_mask(df: pd.DataFrame, xf: CrossFilter) -> np.ndarray:
+    """Boolean array over ``df`` rows: any selected genre AND any selected (country, language) cell."""
+    mask = np.ones(len(df), dtype=bool)
+    if xf.genres:
+        items = df["genres_list"].explode()
+        # explode() emits one missing item for an empty list
+        rows = np.repeat(np.arange(len(df)), list_len(df["genres_list"]).clip(lower=1).to_numpy())
+        mask &= np.bincount(rows, weights=items.isin(xf.genres).to_numpy(), minlength=len(df)) > 0
+    if xf.cells:
+        lists = df["production_countries_list"]
+        counts = list_len(lists).clip(lower=1).to_numpy()
+        rows = np.repeat(np.arange(len(df)), counts)
+        pairs = pd.MultiIndex.from_arrays([
+            lists.explode().to_numpy(),
+            np.repeat(df["original_language"].to_numpy(), counts),
+        ])
+        mask &= np.bincount(rows, weights=pairs.isin(list(xf.cells)), minlength=len(df)) > 0
+    return mask
+
+
+# ------------------------------
+# Aggregate memo
+# ------------------------------
+def _nbytes(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(index=True)))
+    return 0
+
+
+@st.cache_resource(show_spinner=False)
+def get_aggregate_memo() -> LRUCache:
+    """Process-wide memo of row positions and chart aggregates shared by all sessions."""
+    return LRUCache(MEMO_MAX_BYTES, max_entries=MEMO_MAX_ENTRIES, sizeof=_nbytes)
+
+
+@dataclass
+class CrossView:
+    """Sidebar-filtered rows of one snapshot plus the cross-filter, with memoized slices/aggregates."""
+    df_full: pd.DataFrame
+    version: int
+    f: Filters
+    xf: CrossFilter
+    memo: LRUCache
+    # Memory-mapped base table of ``df_full`` (multi-process mode); the sidebar mask then runs on its buffers
+    shared: Optional[SharedTable] = None
+    filters: Tuple = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.filters = filters_key(self.f)
+
+    def positions(self, exclude: Optional[str] = None) -> np.ndarray:
+        """Row positions in ``df_full``; ``exclude`` drops that source's own selection."""
+        rows = self.memo.get_or_compute(("rows", self.version, self.filters), self._sidebar_rows)
+        xf = self.xf.without(exclude)
+        if not xf:
+            return rows
+        return self.memo.get_or_compute(
+            ("xf_rows", self.version, self.filters, xf),
+            lambda: rows[cross_filter_mask(self._mask_columns(rows), xf)],
+        )
+
+    def _mask_columns(self, rows: np.ndarray) -> pd.DataFrame:
+        # Take only the columns the cross-filter reads, not every column of the selection
+        return self.df_full.iloc[rows, self.df_full.columns.get_indexer(MASK_COLUMNS)]
+
+    def _sidebar_rows(self) -> np.ndarray:
+        if self.shared is not None:
+            return np.flatnonzero(self.shared.filter_mask(self.f))
+        return np.flatnonzero(filter_mask(self.df_full, self.f).to_numpy())
+
+    def frame(self, exclude: Optional[str] = None) -> pd.DataFrame:
+        """Filtered rows as a new frame, like ``apply_filters``."""
+        return self.df_full.iloc[self.positions(exclude)].copy()
+
+    def cache_key(self, name: str, params: Tuple, exclude: Optional[str] = None) -> Tuple:
+        """Key of a result computed from ``frame(exclude)`` by ``name`` with ``params``."""
+        return (name, params, self.version, self.filters, self.xf.without(exclude))
+
+    def aggregate(self, name: str, params: Tuple, compute: Callable[[], Any], exclude: Optional[str] = None) -> Any:
+        """Memoized ``compute()`` over the rows of ``frame(exclude)``."""
+        return self.memo.get_or_compute(self.cache_key(name, params, exclude), compute)
+
+
+def build_cross_view(df_full: pd.DataFrame, f: Filters, version: int, shared: Optional[SharedTable] = None) -> CrossView:
+    return CrossView(df_full=df_full, version=version, f=f, xf=read_cross_filter(), memo=get_aggregate_memo(), shared=shared)
@@ -4,14 +4,18 @@ Data loading and cleaning module (downloads Kaggle dataset via kagglehub).
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import TYPE_CHECKING, List, Tuple, Optional
 import os
 import ast
 
 import numpy as np
 import pandas as pd
-import streamlit as st
-import kagglehub
+
+from derived import add_derived_columns
+from moments import MomentStats, build_moment_stats
+
+if TYPE_CHECKING:
+    from shared_table import SharedTable
 
 
 @dataclass
@@ -19,6 +23,9 @@ class LoadResult:
     """Data loading result."""
     df: pd.DataFrame
     source: str
+    moments: Optional[MomentStats] = None
+    # Memory-mapped table the frame was attached from (multi-process mode), if any
+    shared: Optional[SharedTable] = None
 
 
 # ------------------------------
@@ -84,11 +91,27 @@ def clean_movies(raw: pd.DataFrame) -> pd.DataFrame:
 # ------------------------------
 # Loading: prefer kagglehub
 # ------------------------------
-@st.cache_data(show_spinner=True)
-def load_tmdb_via_kagglehub() -> LoadResult:
-    """Download and load the TMDB 5000 dataset via kagglehub."""
+KAGGLE_DATASET = "tmdb/tmdb-movie-metadata"
+
+
+def dataset_dir() -> str:
+    """Local directory of the dataset CSVs.
+
+    ``TMDB_DATA_DIR`` points at a local copy (offline runs, load tests); otherwise the kagglehub
+    download directory is used (first call downloads and caches it).
+    """
+    local_dir = os.environ.get("TMDB_DATA_DIR")
+    if local_dir:
+        return local_dir
+    import kagglehub
+
+    return kagglehub.dataset_download(KAGGLE_DATASET)
+
+
+def read_tmdb_movies() -> LoadResult:
+    """Locate, read and clean the movies CSV and build its derived structures (uncached)."""
     # Download dataset directory (first time will download and cache locally)
-    data_dir = kagglehub.dataset_download("tmdb/tmdb-movie-metadata")
+    data_dir = dataset_dir()
 
     # Candidate CSV paths (official filenames)
     csv_path_candidates: Tuple[str, ...] = (
@@ -98,8 +121,8 @@ def load_tmdb_via_kagglehub() -> LoadResult:
 
     csv_path: Optional[str] = next((p for p in csv_path_candidates if os.path.exists(p)), None)
     if not csv_path:
-        raise FileNotFoundError("tmdb_5000_movies.csv not found in kagglehub download directory")
+        raise FileNotFoundError(f"tmdb_5000_movies.csv not found in {data_dir}")
 
     df = pd.read_csv(csv_path)
-    df = clean_movies(df)
-    return LoadResult(df=df, source=f"kagglehub: {csv_path}")
+    df = add_derived_columns(clean_movies(df))
+    return LoadResult(df=df, source=csv_path, moments=build_moment_stats(df))
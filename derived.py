@@ -0,0 +1,113 @@
+"""
+Registry of derived columns (time buckets, counts, transforms) shared by all charts.
+
+Each column is declared once with the base columns it needs and a vectorized formula. The loader
+adds all of them to the cleaned table in compact dtypes, so filtered frames already carry them.
+Charts read them through ``derived_column``/``with_derived``, which only compute (without copying
+the frame) when a column is missing.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Sequel markers in titles: Part/Chapter, roman numerals II-X, digits 2-5
+SEQUEL_PATTERN = (
+    r"(?:\bPart\b|\bChapter\b|\bII\b|\bIII\b|\bIV\b|\bV\b|\bVI\b|\bVII\b|\bVIII\b|\bIX\b|\bX\b"
+    r"|\b2\b|\b3\b|\b4\b|\b5\b)"
+)
+
+
+@dataclass(frozen=True)
+class DerivedColumn:
+    name: str
+    requires: Tuple[str, ...]
+    compute: Callable[[pd.DataFrame], pd.Series]
+
+
+_REGISTRY: Dict[str, DerivedColumn] = {}
+
+
+def derived(name: str, requires: Tuple[str, ...]):
+    """Register ``fn(df) -> Series`` as the formula of derived column ``name``."""
+    def deco(fn: Callable[[pd.DataFrame], pd.Series]) -> Callable[[pd.DataFrame], pd.Series]:
+        _REGISTRY[name] = DerivedColumn(name=name, requires=requires, compute=fn)
+        return fn
+    return deco
+
+
+@derived("month", requires=("release_date",))
+def _month(df: pd.DataFrame) -> pd.Series:
+    return df["release_date"].dt.month.astype("Int8")
+
+
+@derived("decade", requires=("release_year",))
+def _decade(df: pd.DataFrame) -> pd.Series:
+    return (df["release_year"] // 10 * 10).astype("Int16")
+
+
+def list_len(lists: pd.Series) -> pd.Series:
+    """Item count per row of a list column (Python lists or Arrow ``list`` dtype); missing counts 0."""
+    if isinstance(lists.dtype, pd.ArrowDtype):
+        return lists.list.len().fillna(0).astype("int64")
+    return lists.str.len().fillna(0).astype("int64")
+
+
+@derived("tag_count", requires=("genres_list",))
+def _tag_count(df: pd.DataFrame) -> pd.Series:
+    return list_len(df["genres_list"]).astype("int8")
+
+
+@derived("log_budget", requires=("budget_clip",))
+def _log_budget(df: pd.DataFrame) -> pd.Series:
+    b = df["budget_clip"]
+    return np.log1p(b.where(b > 0)).astype("float32")
+
+
+@derived("log_revenue", requires=("revenue_clip",))
+def _log_revenue(df: pd.DataFrame) -> pd.Series:
+    r = df["revenue_clip"]
+    return np.log1p(r.where(r > 0)).astype("float32")
+
+
+@derived("sequel_tag", requires=("title",))
+def _sequel_tag(df: pd.DataFrame) -> pd.Series:
+    title = df["title"]
+    # Arrow-backed titles (shared table) are matched in Arrow without building Python strings
+    if not isinstance(title.dtype, pd.ArrowDtype):
+        title = title.astype(str)
+    is_sequel = title.str.contains(SEQUEL_PATTERN, case=False, regex=True).fillna(False)
+    return pd.Series(
+        pd.Categorical.from_codes(is_sequel.astype("int8"), categories=["Original", "Sequel"]),
+        index=df.index,
+    )
+
+
+DERIVED_COLUMNS: Tuple[str, ...] = tuple(_REGISTRY)
+
+
+def derived_column(df: pd.DataFrame, name: str) -> pd.Series:
+    """Stored column ``name`` of ``df``, or its formula evaluated on ``df`` (not stored)."""
+    if name in df.columns:
+        return df[name]
+    return _REGISTRY[name].compute(df).rename(name)
+
+
+def with_derived(df: pd.DataFrame, names: Iterable[str]) -> pd.DataFrame:
+    """``df`` itself when it already has every column in ``names``, else a frame with the missing ones added."""
+    missing = [n for n in names if n not in df.columns]
+    if not missing:
+        return df
+    return df.assign(**{n: _REGISTRY[n].compute(df) for n in missing})
+
+
+def add_derived_columns(df: pd.DataFrame, names: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Add the registered columns (all by default) whose inputs exist to ``df`` in place; returns ``df``."""
+    for name in names if names is not None else DERIVED_COLUMNS:
+        spec = _REGISTRY[name]
+        if name not in df.columns and all(c in df.columns for c in spec.requires):
+            df[name] = spec.compute(df)
+    return df
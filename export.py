@@ -0,0 +1,277 @@
+"""
+Streaming export of the filtered selection (Arrow IPC, Parquet, CSV).
+
+Rows are taken from the base table chunk by chunk using the selected row positions (sidebar filters
+and chart cross-filters), so writing an export holds one chunk in memory.
+
+How the file reaches the browser depends on how the app is served:
+
+- ``streamlit run serve.py`` mounts ``EXPORT_ROUTE`` (``export_routes``). The sidebar registers the
+  selection under a random token; the route spools the export to a temporary file and streams it
+  from disk in small blocks, so exports of any size stay at one chunk of memory.
+- ``streamlit run app.py`` has no custom routes, so the sidebar falls back to ``st.download_button``.
+  Streamlit keeps that file in memory, so it is limited to ``EXPORT_MAX_ROWS`` rows.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence
+import io
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+if TYPE_CHECKING:
+    from crossfilter import CrossView
+
+EXPORT_FORMATS = ("csv", "parquet", "arrow")
+FORMAT_LABELS = {"csv": "CSV", "parquet": "Parquet", "arrow": "Arrow IPC"}
+FORMAT_EXT = {"csv": "csv", "parquet": "parquet", "arrow": "arrow"}
+FORMAT_MIME = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+DEFAULT_EXPORT_COLUMNS = [
+    "id", "title", "release_date", "release_year", "original_language",
+    "genres_list", "production_countries_list", "production_companies_list", "spoken_languages_list",
+    "budget", "revenue", "profit", "roi", "runtime", "vote_average", "vote_count", "popularity",
+]
+CHUNK_ROWS = 50_000
+# In-memory downloads (``st.download_button``) only; the export route has no limit
+EXPORT_MAX_ROWS = int(os.environ.get("TMDB_EXPORT_MAX_ROWS", "100000"))
+EXPORT_ROUTE = "/api/export/{token}"
+EXPORT_TTL_S = 600.0
+
+
+def _is_list_column(s: pd.Series) -> bool:
+    if isinstance(s.dtype, pd.ArrowDtype):
+        import pyarrow as pa
+
+        return pa.types.is_list(s.dtype.pyarrow_dtype)
+    if s.dtype != object:
+        return False
+    sample = s.dropna().head(1)
+    return not sample.empty and isinstance(sample.iloc[0], (list, tuple, np.ndarray))
+
+
+def _json_list(v) -> str:
+    return json.dumps([str(x) for x in v] if isinstance(v, (list, tuple, np.ndarray)) else [])
+
+
+def iter_selection_chunks(
+    df: pd.DataFrame, rows: np.ndarray, columns: Sequence[str], chunk_rows: int = CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """Yield the selected rows/columns of ``df`` in chunks of at most ``chunk_rows`` rows.
+
+    ``rows`` is a boolean mask over ``df`` or an array of row positions.
+    """
+    rows = np.asarray(rows)
+    positions = np.flatnonzero(rows) if rows.dtype == bool else rows
+    col_idx = [df.columns.get_loc(c) for c in columns]
+    for start in range(0, len(positions), chunk_rows):
+        yield df.iloc[positions[start:start + chunk_rows], col_idx]
+
+
+def _arrow_schema(df: pd.DataFrame, columns: Sequence[str], list_cols: List[str]):
+    import pyarrow as pa
+
+    fields = []
+    for c in columns:
+        s = df[c]
+        if c in list_cols:
+            typ = pa.list_(pa.string())
+        elif s.dtype == object:
+            typ = pa.string()
+        else:
+            typ = pa.array(s.iloc[:0]).type
+        fields.append(pa.field(str(c), typ))
+    return pa.schema(fields)
+
+
+def write_selection(
+    df: pd.DataFrame,
+    rows: np.ndarray,
+    fmt: str,
+    sink: IO[bytes],
+    columns: Optional[Sequence[str]] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> int:
+    """Write the selected rows to ``sink`` in ``fmt``; returns the number of rows written.
+
+    List columns are written as ``list<string>`` in Arrow/Parquet and as JSON arrays in CSV.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    columns = list(columns) if columns else list(df.columns)
+    list_cols = [c for c in columns if _is_list_column(df[c])]
+    chunks = iter_selection_chunks(df, rows, columns, chunk_rows)
+    n_rows = 0
+
+    if fmt == "csv":
+        header = True
+        for chunk in chunks:
+            if list_cols:
+                chunk = chunk.assign(**{c: chunk[c].map(_json_list) for c in list_cols})
+            chunk.to_csv(sink, header=header, index=False, encoding="utf-8")
+            header = False
+            n_rows += len(chunk)
+        if header:
+            df.iloc[:0][columns].to_csv(sink, index=False, encoding="utf-8")
+        return n_rows
+
+    import pyarrow as pa
+
+    schema = _arrow_schema(df, columns, list_cols)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+    try:
+        for chunk in chunks:
+            batch = pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+            if fmt == "parquet":
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            n_rows += len(chunk)
+    finally:
+        writer.close()
+    return n_rows
+
+
+def export_selection(
+    df: pd.DataFrame, rows: np.ndarray, fmt: str, columns: Optional[Sequence[str]] = None
+) -> bytes:
+    """Export of ``rows`` of ``df`` as bytes, for ``st.download_button`` (bounded by ``EXPORT_MAX_ROWS``)."""
+    sink = io.BytesIO()
+    write_selection(df, rows, fmt, sink, columns=columns)
+    return sink.getvalue()
+
+
+# ------------------------------
+# Export route (ASGI mode)
+# ------------------------------
+@dataclass
+class ExportJob:
+    """A prepared export: the snapshot frame, the selected positions and the output settings."""
+    df: pd.DataFrame
+    rows: np.ndarray
+    fmt: str
+    columns: List[str]
+    created_at: float
+
+
+_JOBS: Dict[str, ExportJob] = {}
+_JOBS_LOCK = threading.Lock()
+_ROUTE_MOUNTED = False
+
+
+def _drop_expired(now: float) -> None:
+    for token in [t for t, job in _JOBS.items() if now - job.created_at > EXPORT_TTL_S]:
+        del _JOBS[token]
+
+
+def register_export(df: pd.DataFrame, rows: np.ndarray, fmt: str, columns: Sequence[str]) -> str:
+    """Keep the export for ``EXPORT_TTL_S`` seconds under a new token; returns the token.
+
+    A job holds a reference to its snapshot frame, so a retired snapshot lives until its jobs expire.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    token = secrets.token_urlsafe(16)
+    now = time.time()
+    with _JOBS_LOCK:
+        _drop_expired(now)
+        _JOBS[token] = ExportJob(df=df, rows=rows, fmt=fmt, columns=list(columns), created_at=now)
+    return token
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+async def _serve_export(request: Any) -> Any:
+    from starlette.background import BackgroundTask
+    from starlette.concurrency import run_in_threadpool
+    from starlette.responses import FileResponse, PlainTextResponse
+
+    with _JOBS_LOCK:
+        _drop_expired(time.time())
+        job = _JOBS.get(request.path_params["token"])
+    if job is None:
+        return PlainTextResponse("This export link has expired. Prepare the download again.", status_code=404)
+    fd, path = tempfile.mkstemp(prefix="tmdb_export_", suffix="." + FORMAT_EXT[job.fmt])
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            await run_in_threadpool(write_selection, job.df, job.rows, job.fmt, sink, job.columns)
+    except Exception:
+        _remove_file(path)
+        raise
+    return FileResponse(
+        path,
+        media_type=FORMAT_MIME[job.fmt],
+        filename=f"tmdb_selection.{FORMAT_EXT[job.fmt]}",
+        background=BackgroundTask(_remove_file, path),
+    )
+
+
+def export_routes() -> List[Any]:
+    """Routes for ``st.App`` (see ``serve.py``); the sidebar links to them once they are mounted."""
+    global _ROUTE_MOUNTED
+    from starlette.routing import Route
+
+    _ROUTE_MOUNTED = True
+    return [Route(EXPORT_ROUTE, _serve_export)]
+
+
+def build_export_sidebar(view: CrossView) -> None:
+    """Sidebar export of the current selection (``view.positions()``); the file is generated only when requested."""
+    df = view.df_full
+    with st.sidebar.expander("Export selection", expanded=False):
+        fmt = st.selectbox("Format", EXPORT_FORMATS, format_func=lambda x: FORMAT_LABELS[x], key="export_fmt")
+        columns = st.multiselect(
+            "Columns",
+            list(df.columns),
+            default=[c for c in DEFAULT_EXPORT_COLUMNS if c in df.columns],
+            key="export_cols",
+        )
+        rows = view.positions()
+        if _ROUTE_MOUNTED:
+            # A link is valid for the selection and settings it was prepared with
+            selection = view.cache_key("export", (fmt, tuple(columns)))
+            if st.button("Prepare download", disabled=not columns, key="export_prepare"):
+                st.session_state["export_link"] = (selection, register_export(df, rows, fmt, columns))
+            link = st.session_state.get("export_link")
+            if link is not None and link[0] == selection:
+                st.link_button(f"Download {FORMAT_LABELS[fmt]}", EXPORT_ROUTE.format(token=link[1]))
+                st.caption(f"{len(rows):,} rows · link valid for {EXPORT_TTL_S / 60:.0f} minutes")
+            return
+
+        too_many = len(rows) > EXPORT_MAX_ROWS
+        st.download_button(
+            f"Download {FORMAT_LABELS[fmt]}",
+            data=lambda: export_selection(df, rows, fmt, columns),
+            file_name=f"tmdb_selection.{FORMAT_EXT[fmt]}",
+            mime=FORMAT_MIME[fmt],
+            on_click="ignore",
+            disabled=not columns or too_many,
+        )
+        if too_many:
+            st.caption(
+                f"{len(rows):,} rows selected. Downloads are limited to {EXPORT_MAX_ROWS:,} rows when the app runs "
+                "with `streamlit run app.py`, because Streamlit keeps the file in memory. Narrow the filters, or "
+                "serve the app with `streamlit run serve.py` to stream exports of any size from disk."
+            )
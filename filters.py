@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Tuple
+from dataclasses import astuple, dataclass
+from typing import Iterable, List, Optional, Tuple
+import re
 
 import numpy as np
 import pandas as pd
@@ -19,6 +20,8 @@ class Filters:
     min_votes: int
     exclude_zero_revenue: bool
     title_kw: str
+    person_id: Optional[int] = None
+    person_role: str = "director"
 
 
 def build_sidebar(df: pd.DataFrame) -> Filters:
@@ -56,6 +59,7 @@ def build_sidebar(df: pd.DataFrame) -> Filters:
     min_votes = st.sidebar.slider("Minimum vote count", vc_min, max(vc_min, vc_max), vc_min)
 
     title_kw = st.sidebar.text_input("Title keyword (optional)", value="")
+    person_id, person_role = _person_filter()
 
     st.sidebar.markdown("---")
     exclude_zero_revenue = st.sidebar.checkbox("Exclude revenue = 0/missing", value=True)
@@ -70,16 +74,54 @@ def build_sidebar(df: pd.DataFrame) -> Filters:
         min_votes=min_votes,
         exclude_zero_revenue=exclude_zero_revenue,
         title_kw=title_kw.strip(),
+        person_id=person_id,
+        person_role=person_role,
     )
 
 
-def apply_filters(df: pd.DataFrame, f: Filters) -> pd.DataFrame:
+def _person_filter() -> Tuple[Optional[int], str]:
+    """Director/actor filter; credits are only loaded once the user enables it."""
+    if not st.sidebar.checkbox("Filter by director/actor", value=False):
+        return None, "director"
+    from credits import PERSON_OPTIONS, ROLES, ROLE_LABELS, person_options
+
+    role = st.sidebar.radio("Role", ROLES, format_func=lambda r: ROLE_LABELS[r], horizontal=True)
+    query = st.sidebar.text_input("Search person", placeholder="Part of a name")
+    try:
+        # Only the best-credited matches are sent to the browser, not every credited person
+        options = person_options(role, query)
+    except Exception:
+        st.sidebar.warning("Cast/crew credits are unavailable (credits CSV missing or download failed); the person filter is off.")
+        return None, "director"
+    person_id = st.sidebar.selectbox("Person", list(options), index=None, format_func=options.__getitem__, placeholder="Choose a person")
+    if not options:
+        st.sidebar.caption("No matching person.")
+    elif len(options) == PERSON_OPTIONS:
+        st.sidebar.caption(f"Showing the {PERSON_OPTIONS} most credited matches; refine the search to find others.")
+    return person_id, role
+
+
+def title_mask(titles: Iterable, keyword: str) -> np.ndarray:
+    """Titles matching ``keyword`` as a case-insensitive Python regular expression (plain text if it is not one).
+
+    Shared by the pandas and Arrow filter paths, so a keyword matches the same rows in both; missing
+    titles never match.
+    """
+    try:
+        pattern = re.compile(keyword, re.IGNORECASE)
+    except re.error:
+        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+    return np.array([isinstance(t, str) and pattern.search(t) is not None for t in titles], dtype=bool)
+
+
+def filter_mask(df: pd.DataFrame, f: Filters) -> pd.Series:
     mask = pd.Series(True, index=df.index)
 
     mask &= df["release_year"].between(f.years[0], f.years[1])
 
     if f.genres:
-        mask &= df["genres_list"].apply(lambda lst: any(g in (lst or []) for g in f.genres))
+        items = df["genres_list"].explode()
+        mask &= items.isin(f.genres).groupby(level=0).any().reindex(df.index, fill_value=False)
 
     if f.languages and "original_language" in df.columns:
         mask &= df["original_language"].isin(f.languages)
@@ -99,9 +141,20 @@ def apply_filters(df: pd.DataFrame, f: Filters) -> pd.DataFrame:
         mask &= df["revenue"].fillna(0) > 0
 
     if f.title_kw:
-        kw = f.title_kw.lower()
-        mask &= df["title"].astype(str).str.lower().str.contains(kw)
+        mask &= title_mask(df["title"], f.title_kw)
+
+    if f.person_id is not None and "id" in df.columns:
+        from credits import load_credits_index
+
+        mask &= df["id"].isin(load_credits_index().movies_for(f.person_id, f.person_role))
 
-    return df.loc[mask].copy()
+    return mask
+
+
+def apply_filters(df: pd.DataFrame, f: Filters) -> pd.DataFrame:
+    return df.loc[filter_mask(df, f)].copy()
 
 
+def filters_key(f: Filters) -> Tuple:
+    """Hashable, canonical form of ``f`` (multi-select lists sorted) for cache keys."""
+    return tuple(tuple(sorted(v)) if isinstance(v, list) else v for v in astuple(f))
@@ -0,0 +1,451 @@
+"""
+Offline load test for concurrent sessions.
+
+Starts ``streamlit run app.py`` headless on a synthetic local dataset (``TMDB_DATA_DIR``, no network)
+and connects many websocket clients to it, the way browser tabs do. Each session replays an
+interaction script (slider drags, Question Hub switches, leaderboard changes) by sending widget
+values and timing the rerun until the script finishes. For each concurrency level the harness
+reports p50/p95/p99 rerun latency, throughput (script runs per second, initial loads included) and
+the server's RSS. It exits non-zero when any run raised or a session failed.
+
+    python loadtest.py --sessions 1,10,25,50 --steps 12 --rows 5000
+
+All sessions talk to one server process, so the numbers size a single replica. The clients run in
+the harness process and only parse messages, but they share the machine's CPUs with the server.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import IO, Any, Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+RUN_TIMEOUT_S = 600.0
+SERVER_START_TIMEOUT_S = 60.0
+
+_GENRES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Drama", "Family", "Fantasy",
+    "History", "Horror", "Music", "Mystery", "Romance", "Science Fiction", "Thriller", "War",
+]
+_COUNTRIES = ["United States of America", "United Kingdom", "France", "Germany", "Japan", "India", "Canada", "China"]
+_LANGUAGES = ["en", "fr", "de", "ja", "hi", "es", "zh", "it"]
+
+
+# ------------------------------
+# Synthetic dataset
+# ------------------------------
+def make_synthetic_movies(n: int = 5000, seed: int = 0) -> pd.DataFrame:
+    """Raw frame in the ``tmdb_5000_movies.csv`` layout (JSON-like list columns, zero budgets, gaps)."""
+    rng = np.random.default_rng(seed)
+
+    def names(pool: Sequence[str], k_max: int) -> str:
+        return json.dumps([{"id": i, "name": x} for i, x in enumerate(rng.choice(pool, rng.integers(0, k_max + 1), replace=False))])
+
+    budget = np.where(rng.random(n) < 0.2, 0, rng.lognormal(16.5, 1.2, n)).round()
+    revenue = np.where(rng.random(n) < 0.15, 0, budget * rng.lognormal(0.6, 1.0, n) + rng.lognormal(14, 2, n)).round()
+    days = rng.integers(0, 365 * 85, n)
+    dates = (pd.Timestamp("1930-01-01") + pd.to_timedelta(days, unit="D")).strftime("%Y-%m-%d").to_numpy(dtype=object)
+    dates[rng.random(n) < 0.005] = None
+    return pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "title": [f"Movie {i}" + (" II" if i % 23 == 0 else "") for i in range(n)],
+        "budget": budget,
+        "revenue": revenue,
+        "runtime": np.where(rng.random(n) < 0.01, np.nan, rng.normal(106, 20, n).clip(40, 240).round()),
+        "vote_average": np.where(rng.random(n) < 0.01, np.nan, rng.normal(6.2, 1.0, n).clip(0, 10).round(1)),
+        "vote_count": rng.integers(0, 12000, n),
+        "popularity": rng.lognormal(2.0, 1.0, n),
+        "release_date": dates,
+        "original_language": rng.choice(_LANGUAGES, n, p=[0.72, 0.06, 0.05, 0.05, 0.03, 0.04, 0.03, 0.02]),
+        "genres": [names(_GENRES, 4) for _ in range(n)],
+        "production_countries": [names(_COUNTRIES, 3) for _ in range(n)],
+        "production_companies": [names([f"Studio {k}" for k in range(80)], 3) for _ in range(n)],
+        "spoken_languages": [names(_LANGUAGES, 2) for _ in range(n)],
+    })
+
+
+def write_synthetic_dataset(data_dir: str, n: int = 5000, seed: int = 0) -> str:
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, "tmdb_5000_movies.csv")
+    make_synthetic_movies(n, seed).to_csv(path, index=False)
+    return path
+
+
+# ------------------------------
+# Server and websocket sessions
+# ------------------------------
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class AppServer:
+    """``streamlit run app.py`` as a headless subprocess on a local port (use as a context manager)."""
+
+    def __init__(self, data_dir: Optional[str] = None, port: int = 0) -> None:
+        self.data_dir = data_dir
+        self.port = port or _free_port()
+        self.proc: Optional[subprocess.Popen] = None
+        self._log: Optional[IO[bytes]] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def __enter__(self) -> "AppServer":
+        env = dict(os.environ)
+        if self.data_dir:
+            env["TMDB_DATA_DIR"] = self.data_dir
+        env.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+        cmd = [
+            sys.executable, "-m", "streamlit", "run", APP_PATH,
+            "--server.headless=true", "--server.address=127.0.0.1", f"--server.port={self.port}",
+            "--server.fileWatcherType=none", "--browser.gatherUsageStats=false",
+        ]
+        self._log = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(cmd, env=env, stdout=self._log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + SERVER_START_TIMEOUT_S
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"streamlit exited with code {self.proc.returncode}:\n{self._log_tail()}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise TimeoutError(f"streamlit did not become healthy within {SERVER_START_TIMEOUT_S:.0f}s")
+
+    def __exit__(self, *exc) -> None:
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def _log_tail(self, n_bytes: int = 4000) -> str:
+        self._log.seek(0)
+        return self._log.read().decode(errors="replace")[-n_bytes:]
+
+    def rss_mb(self) -> Tuple[float, float]:
+        """Current and peak RSS of the server process (NaN where ``/proc`` is unavailable)."""
+        current = peak = float("nan")
+        try:
+            with open(f"/proc/{self.proc.pid}/status") as fh:
+                for line in fh:
+                    if line.startswith("VmRSS:"):
+                        current = int(line.split()[1]) / 1024
+                    elif line.startswith("VmHWM:"):
+                        peak = int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return current, peak
+
+
+@dataclass
+class Page:
+    """What the client saw in the last completed run: widgets by (kind, label), text and exceptions."""
+    widgets: Dict[Tuple[str, str], Any] = field(default_factory=dict)
+    texts: List[str] = field(default_factory=list)
+    exceptions: int = 0
+
+    def widget(self, kind: str, label: str) -> Any:
+        try:
+            return self.widgets[(kind, label)]
+        except KeyError:
+            raise LookupError(f"{kind} {label!r} not found") from None
+
+
+class Session:
+    """One browser tab: a websocket to the server plus the widget values it has set, like the frontend."""
+
+    def __init__(self, ws: Any) -> None:
+        self.ws = ws
+        self.page_hash = ""
+        self.states: Dict[str, Any] = {}
+
+    def set(self, state: Any) -> None:
+        self.states[state.id] = state
+
+    async def run(self) -> Page:
+        """Request a rerun with the current widget values and read messages until the script finishes."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page_hash
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        await self.ws.send(msg.SerializeToString())
+        page = Page()
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = fwd.new_session.page_script_hash
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                etype = element.WhichOneof("type")
+                if etype == "exception":
+                    page.exceptions += 1
+                elif etype in ("slider", "selectbox"):
+                    widget = getattr(element, etype)
+                    page.widgets[(etype, widget.label)] = widget
+                elif etype == "markdown":
+                    page.texts.append(element.markdown.body)
+            elif kind == "script_finished":
+                if fwd.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    page.exceptions += 1
+                if fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return page
+
+
+async def _connect(url: str) -> Any:
+    import websockets
+
+    return await websockets.connect(url, subprotocols=["streamlit"], max_size=None)
+
+
+# ------------------------------
+# Interaction scripts
+# ------------------------------
+def _range_state(w, lo: float, hi: float):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    state = WidgetState(id=w.id)
+    state.double_array_value.data.extend([lo, hi])
+    return state
+
+
+def _value_state(w, value: float):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    state = WidgetState(id=w.id)
+    state.double_array_value.data.append(value)
+    return state
+
+
+def _option_state(w, option: str):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    return WidgetState(id=w.id, string_value=option)
+
+
+def drag_year_slider(page: Page, rng: random.Random):
+    w = page.widget("slider", "Release year range")
+    lo, hi = int(w.min), int(w.max)
+    a = rng.randint(lo, hi - 1)
+    return _range_state(w, a, rng.randint(a + 1, hi))
+
+
+def drag_vote_slider(page: Page, rng: random.Random):
+    w = page.widget("slider", "Vote average range")
+    a = round(rng.uniform(0.0, 6.0), 1)
+    return _range_state(w, a, round(rng.uniform(a + 1.0, 10.0), 1))
+
+
+def switch_hub(page: Page, rng: random.Random):
+    w = page.widget("selectbox", "Choose an example chart:")
+    return _option_state(w, rng.choice(list(w.options)))
+
+
+def change_leaderboard(page: Page, rng: random.Random):
+    if rng.random() < 0.5:
+        w = page.widget("selectbox", "Sort by")
+        return _option_state(w, rng.choice(list(w.options)))
+    return _value_state(page.widget("slider", "Top N"), rng.randint(5, 50))
+
+
+def change_genre_topk(page: Page, rng: random.Random):
+    return _value_state(page.widget("slider", "TopK"), rng.randint(5, 30))
+
+
+# (action, weight): dragging sliders and switching hub charts dominate real sessions
+INTERACTIONS: List[Tuple[Callable, float]] = [
+    (drag_year_slider, 3.0),
+    (drag_vote_slider, 1.5),
+    (switch_hub, 3.0),
+    (change_leaderboard, 1.5),
+    (change_genre_topk, 1.0),
+]
+
+
+# ------------------------------
+# Runner
+# ------------------------------
+@dataclass
+class LevelResult:
+    sessions: int
+    reruns: int
+    errors: int
+    wall_s: float
+    throughput_rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    initial_p50_ms: float
+    rss_mb: float
+    peak_rss_mb: float
+    spec_cache_hit_rate: float = 0.0
+    per_action_p95_ms: Dict[str, float] = field(default_factory=dict)
+
+
+_SPEC_CACHE_CAPTION = re.compile(r"Chart spec cache: .*?\(([\d,]+) of ([\d,]+)\)")
+
+
+async def _spec_cache_counts(url: str) -> Tuple[int, int]:
+    """(hits, lookups) of the server's chart spec cache, read from the caption of one page load."""
+    ws = await _connect(url)
+    try:
+        page = await asyncio.wait_for(Session(ws).run(), RUN_TIMEOUT_S)
+    finally:
+        await ws.close()
+    for text in page.texts:
+        m = _SPEC_CACHE_CAPTION.search(text)
+        if m:
+            return int(m.group(1).replace(",", "")), int(m.group(2).replace(",", ""))
+    return 0, 0
+
+
+async def _session(conn: Any, idx: int, steps: int, seed: int, out: List[Tuple[str, float, bool]]) -> None:
+    """Replay one session; any failure is recorded as an error sample instead of ending the task silently."""
+    name, t0 = "initial", None
+    try:
+        if isinstance(conn, BaseException):
+            raise conn
+        session = Session(conn)
+        rng = random.Random(seed * 100_003 + idx)
+        actions, weights = zip(*INTERACTIONS)
+        t0 = time.perf_counter()
+        page = await asyncio.wait_for(session.run(), RUN_TIMEOUT_S)
+        out.append((name, time.perf_counter() - t0, page.exceptions > 0))
+        for _ in range(steps):
+            action = rng.choices(actions, weights)[0]
+            name, t0 = action.__name__, None
+            try:
+                session.set(action(page, rng))
+            except LookupError:
+                continue
+            t0 = time.perf_counter()
+            page = await asyncio.wait_for(session.run(), RUN_TIMEOUT_S)
+            out.append((name, time.perf_counter() - t0, page.exceptions > 0))
+    except Exception:
+        # Latency only when the failure happened inside a run (e.g. a RUN_TIMEOUT_S timeout)
+        out.append((name, time.perf_counter() - t0 if t0 is not None else float("nan"), True))
+    finally:
+        if not isinstance(conn, BaseException):
+            await conn.close()
+
+
+async def _run_sessions(url: str, sessions: int, steps: int, seed: int, out: List[Tuple[str, float, bool]]) -> float:
+    """Connect all sessions, then replay them concurrently; returns the wall time of the replay."""
+    conns = await asyncio.gather(*(_connect(url) for _ in range(sessions)), return_exceptions=True)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_session(conn, i, steps, seed, out) for i, conn in enumerate(conns)))
+    return time.perf_counter() - t0
+
+
+def run_level(sessions: int, steps: int, seed: int = 0, server: Optional[AppServer] = None) -> LevelResult:
+    """Run ``sessions`` concurrent sessions of ``steps`` interactions each against ``server``.
+
+    Without a server, one is started for this level (``TMDB_DATA_DIR`` must point at the dataset).
+    """
+    if server is None:
+        with AppServer() as own:
+            return run_level(sessions, steps, seed, own)
+
+    samples: List[Tuple[str, float, bool]] = []
+    spec_before = asyncio.run(_spec_cache_counts(server.url))
+    wall = asyncio.run(_run_sessions(server.url, sessions, steps, seed, samples))
+    spec_after = asyncio.run(_spec_cache_counts(server.url))
+
+    # Samples of sessions that failed outside a run carry no latency
+    timed = [s for s in samples if not np.isnan(s[1])]
+    reruns = [s for s in timed if s[0] != "initial"]
+    lat = np.array([s[1] for s in reruns]) * 1000 if reruns else np.array([np.nan])
+    initial = np.array([s[1] for s in timed if s[0] == "initial"]) * 1000
+    per_action: Dict[str, List[float]] = {}
+    for name, sec, _ in reruns:
+        per_action.setdefault(name, []).append(sec * 1000)
+    rss, peak = server.rss_mb()
+    spec_hits = spec_after[0] - spec_before[0]
+    spec_total = spec_after[1] - spec_before[1]
+    return LevelResult(
+        sessions=sessions,
+        reruns=len(reruns),
+        errors=sum(1 for s in samples if s[2]),
+        wall_s=wall,
+        throughput_rps=len(timed) / wall if wall else 0.0,
+        p50_ms=float(np.percentile(lat, 50)),
+        p95_ms=float(np.percentile(lat, 95)),
+        p99_ms=float(np.percentile(lat, 99)),
+        initial_p50_ms=float(np.percentile(initial, 50)) if len(initial) else float("nan"),
+        rss_mb=rss,
+        peak_rss_mb=peak,
+        spec_cache_hit_rate=spec_hits / spec_total if spec_total else 0.0,
+        per_action_p95_ms={k: float(np.percentile(v, 95)) for k, v in sorted(per_action.items())},
+    )
+
+
+def run_load_test(levels: Sequence[int], steps: int, rows: int, seed: int = 0, data_dir: Optional[str] = None) -> List[LevelResult]:
+    """Write the synthetic dataset, start the server, warm its caches with one session, then run each level."""
+    data_dir = data_dir or tempfile.mkdtemp(prefix="tmdb_loadtest_")
+    if not os.path.exists(os.path.join(data_dir, "tmdb_5000_movies.csv")):
+        write_synthetic_dataset(data_dir, rows, seed)
+    with AppServer(data_dir) as server:
+        run_level(1, 0, seed, server)
+        return [run_level(n, steps, seed, server) for n in levels]
+
+
+def _print_report(results: Sequence[LevelResult]) -> None:
+    header = f"{'sessions':>8} {'reruns':>7} {'errors':>6} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'RSS MB':>8} {'peak MB':>8} {'spec hit':>8}"
+    print(header)
+    for r in results:
+        print(
+            f"{r.sessions:>8} {r.reruns:>7} {r.errors:>6} {r.throughput_rps:>7.2f} {r.p50_ms:>8.0f} "
+            f"{r.p95_ms:>8.0f} {r.p99_ms:>8.0f} {r.rss_mb:>8.0f} {r.peak_rss_mb:>8.0f} {r.spec_cache_hit_rate:>8.0%}"
+        )
+
+
+def main(argv: Sequence[str] = ()) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,5,10,25,50", help="comma-separated concurrency levels")
+    parser.add_argument("--steps", type=int, default=12, help="interactions per session")
+    parser.add_argument("--rows", type=int, default=5000, help="synthetic dataset size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=None, help="reuse/keep the synthetic dataset here")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write results as JSON")
+    args = parser.parse_args(list(argv))
+
+    levels = [int(x) for x in args.sessions.split(",") if x.strip()]
+    results = run_load_test(levels, args.steps, args.rows, args.seed, args.data_dir)
+    _print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump([asdict(r) for r in results], fh, indent=2)
+    return 1 if any(r.errors for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
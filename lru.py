@@ -0,0 +1,92 @@
+"""
+Thread-safe LRU cache bounded by total size in bytes (and optionally entry count), with hit statistics.
+
+One implementation serves every process-wide cache of the app: the chart spec cache
+(``spec_cache.py``) and the cross-filter aggregate memo (``crossfilter.py``). Each passes a ``sizeof``
+function for its values.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional, Tuple
+import threading
+
+_MISSING = object()
+
+
+@dataclass
+class LRUStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    nbytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache:
+    """Least recently used entries are evicted once ``max_bytes`` (or ``max_entries``) is exceeded.
+
+    ``sizeof(value)`` gives an entry's size in bytes. A value larger than ``max_bytes`` is not stored.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: Optional[int] = None, sizeof: Callable[[Any], int] = lambda v: 0):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._items: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self._misses += 1
+                return default
+            self._items.move_to_end(key)
+            self._hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[1]
+            self._items[key] = (value, size)
+            self._nbytes += size
+            while self._nbytes > self.max_bytes or (self.max_entries is not None and len(self._items) > self.max_entries):
+                _, (_, dropped) = self._items.popitem(last=False)
+                self._nbytes -= dropped
+                self._evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value of ``key``; on a miss ``compute()`` runs outside the lock and its result is stored."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self) -> LRUStats:
+        with self._lock:
+            return LRUStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._items),
+                nbytes=self._nbytes,
+                max_bytes=self.max_bytes,
+            )
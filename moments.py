@@ -0,0 +1,239 @@
+"""
+Mergeable moment statistics (count, sums, squares, cross-products) per data partition.
+
+The cleaned table is split into partitions of release year × original language × genre combination
+× "has revenue". Each partition keeps its sufficient statistics for a fixed set of numeric columns,
+so means and Pearson correlations for any filter made only of those dimensions come from summing
+partition statistics instead of rescanning the filtered rows.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from filters import Filters
+
+
+# Numeric columns tracked by the statistics (corr heatmap columns + Q1 caption columns).
+MOMENT_COLUMNS: Tuple[str, ...] = (
+    "budget", "revenue", "runtime", "popularity", "vote_average", "vote_count", "profit", "roi",
+    "budget_clip", "revenue_clip", "log_budget_clip",
+)
+
+
+@dataclass
+class Moments:
+    """Merged statistics of a selection; pairwise-complete, like ``DataFrame.corr``.
+
+    For columns i, j: ``n[i, j]`` counts rows where both are present, ``s[i, j]`` sums column i over
+    those rows, ``q[i, j]`` sums its squares and ``p[i, j]`` sums the cross-products. Values are
+    shifted by ``shift`` (global column means) to keep the sums well conditioned.
+    """
+    columns: Tuple[str, ...]
+    n_rows: int
+    n: np.ndarray
+    s: np.ndarray
+    q: np.ndarray
+    p: np.ndarray
+    shift: np.ndarray
+
+    def _idx(self, col: str) -> int:
+        return self.columns.index(col)
+
+    def count(self, a: str, b: Optional[str] = None) -> int:
+        i = self._idx(a)
+        j = self._idx(b) if b is not None else i
+        return int(self.n[i, j])
+
+    def mean(self, col: str) -> float:
+        i = self._idx(col)
+        n = self.n[i, i]
+        return float(self.s[i, i] / n + self.shift[i]) if n else np.nan
+
+    def corr(self, a: str, b: str) -> float:
+        i, j = self._idx(a), self._idx(b)
+        n = self.n[i, j]
+        if n < 2:
+            return np.nan
+        sx, sy = self.s[i, j], self.s[j, i]
+        cov = self.p[i, j] - sx * sy / n
+        var_x = self.q[i, j] - sx * sx / n
+        var_y = self.q[j, i] - sy * sy / n
+        if var_x <= 0 or var_y <= 0:
+            return np.nan
+        return float(np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0))
+
+    def corr_matrix(self, cols: Sequence[str]) -> pd.DataFrame:
+        """Same shape and labels as ``df[cols].corr()``."""
+        cols = list(cols)
+        out = np.full((len(cols), len(cols)), np.nan)
+        for a, ca in enumerate(cols):
+            for b in range(a, len(cols)):
+                out[a, b] = out[b, a] = self.corr(ca, cols[b])
+        return pd.DataFrame(out, index=cols, columns=cols)
+
+
+@dataclass
+class MomentStats:
+    """Per-partition statistics for the cleaned movie table."""
+    columns: Tuple[str, ...]
+    shift: np.ndarray
+    # Partition keys, one entry per partition
+    part_year: np.ndarray
+    part_lang: np.ndarray
+    part_combo: np.ndarray
+    part_has_revenue: np.ndarray
+    part_rows: np.ndarray
+    # Genre combination × genre membership
+    genres: Tuple[str, ...]
+    combo_genres: np.ndarray
+    # Per-partition sufficient statistics, shape (partitions, k, k)
+    n: np.ndarray
+    s: np.ndarray
+    q: np.ndarray
+    p: np.ndarray
+    # Bounds that make the non-partition filters a no-op
+    vote_bounds: Tuple[float, float]
+    runtime_bounds: Optional[Tuple[float, float]]
+    vote_count_min: Optional[float]
+    has_language: bool
+    has_revenue: bool
+
+    def covers(self, f: "Filters") -> bool:
+        """True when ``f`` only restricts year, genres, languages and the zero-revenue flag."""
+        if f.title_kw or f.roi_min > 0 or f.person_id is not None:
+            return False
+        if f.vote_range[0] > self.vote_bounds[0] or f.vote_range[1] < self.vote_bounds[1]:
+            return False
+        if self.runtime_bounds is not None and (
+            f.runtime_range[0] > self.runtime_bounds[0] or f.runtime_range[1] < self.runtime_bounds[1]
+        ):
+            return False
+        if f.min_votes > 0 and (self.vote_count_min is None or f.min_votes > self.vote_count_min):
+            return False
+        return True
+
+    def query(self, f: "Filters") -> Optional[Moments]:
+        """Merge the partitions selected by ``f``; None when ``f`` is not partition-only."""
+        if not self.covers(f):
+            return None
+        sel = (self.part_year >= f.years[0]) & (self.part_year <= f.years[1])
+        if f.genres:
+            wanted = np.isin(np.asarray(self.genres, dtype=object), list(f.genres))
+            sel &= self.combo_genres[:, wanted].any(axis=1)[self.part_combo]
+        if f.languages and self.has_language:
+            sel &= np.isin(self.part_lang, list(f.languages))
+        if f.exclude_zero_revenue and self.has_revenue:
+            sel &= self.part_has_revenue
+        return Moments(
+            columns=self.columns,
+            n_rows=int(self.part_rows[sel].sum()),
+            n=self.n[sel].sum(axis=0),
+            s=self.s[sel].sum(axis=0),
+            q=self.q[sel].sum(axis=0),
+            p=self.p[sel].sum(axis=0),
+            shift=self.shift,
+        )
+
+
+def _moment_frame(df: pd.DataFrame) -> pd.DataFrame:
+    cols: Dict[str, pd.Series] = {}
+    for c in MOMENT_COLUMNS:
+        if c == "log_budget_clip" and "budget_clip" in df.columns:
+            b = df["budget_clip"]
+            cols[c] = np.log1p(b.where(b > 0))
+        elif c in df.columns:
+            cols[c] = pd.to_numeric(df[c], errors="coerce")
+        else:
+            cols[c] = pd.Series(np.nan, index=df.index)
+    return pd.DataFrame(cols, index=df.index)
+
+
+def build_moment_stats(df: pd.DataFrame) -> MomentStats:
+    """Compute partition statistics for a cleaned movie table (output of ``clean_movies``)."""
+    # Rows that apply_filters drops for any value of the partition-only filters
+    base = df["release_year"].notna() & df["vote_average"].notna()
+    runtime_any = bool(df["runtime"].notna().any())
+    if runtime_any:
+        base &= df["runtime"].notna()
+    sub = df.loc[base]
+
+    has_language = "original_language" in df.columns
+    has_revenue = "revenue" in df.columns
+    lang = sub["original_language"].fillna("").astype(str) if has_language else pd.Series("", index=sub.index)
+    rev = sub["revenue"].fillna(0) > 0 if has_revenue else pd.Series(False, index=sub.index)
+    items = sub["genres_list"].explode().dropna()
+    combo_key = items.groupby(level=0).agg(lambda g: "|".join(sorted(set(g)))).reindex(sub.index, fill_value="")
+
+    keys = pd.DataFrame({
+        "year": sub["release_year"].astype("int64"),
+        "lang": lang,
+        "combo": combo_key,
+        "rev": rev.astype(bool),
+    })
+    group = keys.groupby(["year", "lang", "combo", "rev"], sort=False).ngroup().to_numpy()
+    firsts = keys.groupby(["year", "lang", "combo", "rev"], sort=False).head(1)
+    n_parts = len(firsts)
+
+    combo_codes, combo_uniques = pd.factorize(firsts["combo"])
+    genres = tuple(sorted({g for key in combo_uniques for g in key.split("|") if g}))
+    genre_pos = {g: i for i, g in enumerate(genres)}
+    combo_genres = np.zeros((len(combo_uniques), len(genres)), dtype=bool)
+    for ci, key in enumerate(combo_uniques):
+        for g in key.split("|"):
+            if g:
+                combo_genres[ci, genre_pos[g]] = True
+
+    x = _moment_frame(sub).to_numpy(dtype="float64")
+    valid = ~np.isnan(x)
+    counts = valid.sum(axis=0)
+    shift = np.where(valid, x, 0.0).sum(axis=0) / np.maximum(counts, 1)
+    x0 = np.where(valid, x - shift, 0.0)
+    vf = valid.astype("float64")
+
+    k = x.shape[1]
+    n = np.zeros((n_parts, k, k))
+    s = np.zeros((n_parts, k, k))
+    q = np.zeros((n_parts, k, k))
+    p = np.zeros((n_parts, k, k))
+    for i in range(k):
+        for j in range(k):
+            w = vf[:, i] * vf[:, j]
+            s[:, i, j] = np.bincount(group, weights=x0[:, i] * vf[:, j], minlength=n_parts)
+            q[:, i, j] = np.bincount(group, weights=x0[:, i] ** 2 * vf[:, j], minlength=n_parts)
+            if j >= i:
+                n[:, i, j] = n[:, j, i] = np.bincount(group, weights=w, minlength=n_parts)
+                p[:, i, j] = p[:, j, i] = np.bincount(group, weights=x0[:, i] * x0[:, j], minlength=n_parts)
+
+    vc = df["vote_count"] if "vote_count" in df.columns else None
+    if vc is None:
+        vote_count_min = np.inf
+    elif vc.isna().any():
+        vote_count_min = None
+    else:
+        vote_count_min = float(vc.min())
+
+    return MomentStats(
+        columns=MOMENT_COLUMNS,
+        shift=shift,
+        part_year=firsts["year"].to_numpy(),
+        part_lang=firsts["lang"].to_numpy(dtype=object),
+        part_combo=combo_codes,
+        part_has_revenue=firsts["rev"].to_numpy(dtype=bool),
+        part_rows=np.bincount(group, minlength=n_parts),
+        genres=genres,
+        combo_genres=combo_genres,
+        n=n,
+        s=s,
+        q=q,
+        p=p,
+        vote_bounds=(float(np.nanmin(df["vote_average"])), float(np.nanmax(df["vote_average"]))),
+        runtime_bounds=(float(df["runtime"].min()), float(df["runtime"].max())) if runtime_any else None,
+        vote_count_min=vote_count_min,
+        has_language=has_language,
+        has_revenue=has_revenue,
+    )
@@ -1,38 +1,21 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING, Optional
+
 import numpy as np
 import pandas as pd
 import streamlit as st
 
-from charts import (
-    chart_budget_vs_revenue,
-    chart_vote_vs_budget,
-    chart_popularity_vs_revenue,
-    chart_genre_roi,
-    chart_tag_count_relation,
-    chart_country_language_heat,
-    chart_country_language_facet_bar,
-    chart_month_seasonality,
-    chart_month_seasonality_heat,
-    chart_decade_multi_trend,
-    chart_sequel_original_bar,
-    chart_vote_count_stability_line,
-    chart_roi_profile_compare,
-    chart_roi_profile_radar,
-    chart_genre_country_heat,
-    chart_runtime_vote_loess_facet,
-    chart_budget_bin_roi_turning,
-    chart_vote_hist,
-    chart_year_trend,
-    chart_runtime_box_by_genre,
-    chart_corr_heatmap,
-    chart_genre_share_by_decade,
-    chart_country_roi,
-    chart_company_roi,
-)
-
-
-def section_question_1(df: pd.DataFrame) -> None:
+from moments import Moments
+
+if TYPE_CHECKING:
+    from crossfilter import CrossView
+
+
+def section_question_1(df: pd.DataFrame, moments: Optional[Moments] = None, view: Optional[CrossView] = None) -> None:
+    from charts import chart_budget_vs_revenue, chart_vote_vs_budget, chart_popularity_vs_revenue
+    from spec_cache import render_chart
+
     st.subheader("Question 1: Do bigger budgets lead to higher revenue/ratings?")
     st.markdown(
         "- View A: Budget vs Revenue\n"
@@ -43,69 +26,109 @@ def section_question_1(df: pd.DataFrame) -> None:
     col_a, col_b = st.columns(2)
     with col_a:
         st.markdown("View A: Budget vs Revenue")
-        has_a = df[["budget_clip", "revenue_clip"]].dropna().shape[0] > 0
+        if moments is not None:
+            has_a = moments.count("budget_clip", "revenue_clip") > 0
+        else:
+            has_a = df[["budget_clip", "revenue_clip"]].dropna().shape[0] > 0
         use_df_a = df if has_a else st.session_state.get("df_full", df)
         if not has_a:
             st.warning("No plottable data under current filters. Using full dataset for View A as a fallback.")
-        corr_a = (
-            use_df_a[["budget_clip", "revenue_clip"]].corr().iloc[0, 1]
-            if use_df_a.shape[0]
-            else np.nan
-        )
+        if has_a and moments is not None:
+            corr_a = moments.corr("budget_clip", "revenue_clip")
+        else:
+            corr_a = (
+                use_df_a[["budget_clip", "revenue_clip"]].corr().iloc[0, 1]
+                if use_df_a.shape[0]
+                else np.nan
+            )
         st.caption(f"Correlation: Budget-Revenue = {corr_a:.2f}")
-        st.altair_chart(chart_budget_vs_revenue(use_df_a), use_container_width=True)
+        render_chart(view, "budget_vs_revenue", (has_a,), lambda: chart_budget_vs_revenue(use_df_a))
 
     with col_b:
         st.markdown("View B: Budget vs Rating")
-        sub_b = df.dropna(subset=["budget_clip", "vote_average"]).query("budget_clip > 0")
-        has_b = sub_b.shape[0] > 0
+        if moments is not None:
+            has_b = moments.count("log_budget_clip", "vote_average") > 0
+        else:
+            has_b = df.dropna(subset=["budget_clip", "vote_average"]).query("budget_clip > 0").shape[0] > 0
         use_df_b = df if has_b else st.session_state.get("df_full", df)
-        use_sub_b = (
-            use_df_b.dropna(subset=["budget_clip", "vote_average"]).query("budget_clip > 0")
-            if use_df_b is not None
-            else sub_b
-        )
         if not has_b:
             st.warning("No plottable data under current filters. Using full dataset for View B as a fallback.")
-        corr_b = (
-            np.corrcoef(np.log1p(use_sub_b["budget_clip"]), use_sub_b["vote_average"])[0, 1]
-            if use_sub_b.shape[0]
-            else np.nan
-        )
+        if has_b and moments is not None:
+            corr_b = moments.corr("log_budget_clip", "vote_average")
+        else:
+            use_sub_b = use_df_b.dropna(subset=["budget_clip", "vote_average"]).query("budget_clip > 0")
+            corr_b = (
+                np.corrcoef(np.log1p(use_sub_b["budget_clip"]), use_sub_b["vote_average"])[0, 1]
+                if use_sub_b.shape[0]
+                else np.nan
+            )
         st.caption(f"Correlation: ln(Budget)-Rating = {corr_b:.2f}")
-        st.altair_chart(chart_vote_vs_budget(use_df_b), use_container_width=True)
+        render_chart(view, "vote_vs_budget", (has_b,), lambda: chart_vote_vs_budget(use_df_b))
 
     with st.expander("View C: Popularity vs Revenue", expanded=False):
-        sub_c = df.dropna(subset=["popularity", "revenue_clip"]) if df.shape[0] else df
-        if sub_c.shape[0] == 0:
+        if moments is not None:
+            n_c = moments.count("popularity", "revenue_clip")
+        else:
+            sub_c = df.dropna(subset=["popularity", "revenue_clip"]) if df.shape[0] else df
+            n_c = sub_c.shape[0]
+        if n_c == 0:
             st.info("Insufficient popularity/revenue data under current filters. Consider broadening your filters.")
         else:
-            corr_c = sub_c[["popularity", "revenue_clip"]].corr().iloc[0, 1]
+            if moments is not None:
+                corr_c = moments.corr("popularity", "revenue_clip")
+            else:
+                corr_c = sub_c[["popularity", "revenue_clip"]].corr().iloc[0, 1]
             st.caption(f"Correlation: Popularity-Revenue = {corr_c:.2f}")
-            st.altair_chart(chart_popularity_vs_revenue(df), use_container_width=True)
+            render_chart(view, "popularity_vs_revenue", (), lambda: chart_popularity_vs_revenue(df))
+
 
+def section_question_2(df: pd.DataFrame, view: Optional[CrossView] = None) -> None:
+    from charts import chart_genre_roi, genre_roi_stats
+    from spec_cache import render_chart
 
-def section_question_2(df: pd.DataFrame) -> None:
     st.subheader("Question 2: Which genres have higher ROI?")
     st.markdown("- View: Median ROI by genre ranking")
     topk = st.slider("TopK", 5, 30, 10, key="k_roi")
-    st.altair_chart(chart_genre_roi(df, top_k=topk), use_container_width=True)
-
-    exploded = df.explode("genres_list")
-    grp = (
-        exploded.groupby("genres_list", dropna=True)
-        .agg(median_roi=("roi", "median"), n=("id", "count"))
-        .reset_index()
-        .dropna(subset=["genres_list"])
-    )
+    if view is None:
+        grp = genre_roi_stats(df)
+        render_chart(None, "genre_roi", (topk,), lambda: chart_genre_roi(df, top_k=topk, stats=grp))
+    else:
+        from crossfilter import GENRE, chart_key, on_chart_select
+
+        # The genre chart ignores its own selection so unselected genres stay clickable
+        grp = view.aggregate("genre_roi", (), lambda: genre_roi_stats(view.frame(exclude=GENRE)), exclude=GENRE)
+        st.caption("Click bars to cross-filter the page by genre (shift-click to add more).")
+        render_chart(
+            view,
+            "genre_roi",
+            (topk,),
+            lambda: chart_genre_roi(df, top_k=topk, stats=grp),
+            exclude=GENRE,
+            on_select=on_chart_select(GENRE),
+            key=chart_key(GENRE),
+        )
+
     if not grp.empty:
         best = grp.sort_values("median_roi", ascending=False).iloc[0]
         st.success(
-            f"Top genre: {best['genres_list']} (Median ROI={best['median_roi']:.2f}, Samples={int(best['n'])})"
+            f"Top genre: {best['genres_list']} (Median ROI={best['median_roi']:.2f}, Samples={int(best['count'])})"
         )
 
 
-def section_questions_hub(df: pd.DataFrame) -> None:
+def section_questions_hub(df: pd.DataFrame, view: Optional[CrossView] = None) -> None:
+    from charts import (
+        country_language_stats,
+        chart_runtime_vote_loess_facet,
+        chart_tag_count_relation,
+        chart_country_language_heat,
+        chart_country_language_facet_bar,
+        chart_month_seasonality,
+        chart_month_seasonality_heat,
+        chart_decade_multi_trend,
+        chart_sequel_original_bar,
+    )
+    from spec_cache import render_chart
+
     st.subheader("Question Hub")
 
     opt = st.selectbox(
@@ -124,45 +147,81 @@ def section_questions_hub(df: pd.DataFrame) -> None:
 
     if opt == "Runtime vs Rating":
         k = st.slider("Facet TopK (by genre)", 2, 8, 4)
-        st.altair_chart(chart_runtime_vote_loess_facet(df, top_k=k), use_container_width=True)
+        render_chart(view, "runtime_vote_loess_facet", (k,), lambda: chart_runtime_vote_loess_facet(df, top_k=k))
     elif opt == "Tag count vs Rating":
-        st.altair_chart(chart_tag_count_relation(df, target="vote"), use_container_width=True)
+        render_chart(view, "tag_count_relation", ("vote",), lambda: chart_tag_count_relation(df, target="vote"))
     elif opt == "Country × Language × ROI (Heatmap)":
         metric = st.selectbox("Metric", ("roi", "revenue"), index=0, format_func=lambda x: "ROI" if x == "roi" else "Revenue")
-        st.altair_chart(chart_country_language_heat(df, metric=metric), use_container_width=True)
+        if view is None:
+            render_chart(None, "country_language_heat", (metric,), lambda: chart_country_language_heat(df, metric=metric))
+        else:
+            from crossfilter import COUNTRY_LANGUAGE, chart_key, on_chart_select
+
+            stats = view.aggregate(
+                "country_language",
+                (metric,),
+                lambda: country_language_stats(view.frame(exclude=COUNTRY_LANGUAGE), metric=metric),
+                exclude=COUNTRY_LANGUAGE,
+            )
+            st.caption("Click cells to cross-filter the page by country and language.")
+            render_chart(
+                view,
+                "country_language_heat",
+                (metric,),
+                lambda: chart_country_language_heat(df, metric=metric, stats=stats),
+                exclude=COUNTRY_LANGUAGE,
+                on_select=on_chart_select(COUNTRY_LANGUAGE),
+                key=chart_key(COUNTRY_LANGUAGE),
+            )
     elif opt == "Country × Language × ROI (Facet Bar)":
         metric = st.selectbox("Metric", ("roi", "revenue"), index=0, format_func=lambda x: "ROI" if x == "roi" else "Revenue", key="metric_facet")
-        st.altair_chart(chart_country_language_facet_bar(df, metric=metric), use_container_width=True)
+        render_chart(view, "country_language_facet_bar", (metric,), lambda: chart_country_language_facet_bar(df, metric=metric))
     elif opt == "Release month vs Revenue and Rating":
-        st.altair_chart(chart_month_seasonality(df), use_container_width=True)
+        render_chart(view, "month_seasonality", (), lambda: chart_month_seasonality(df))
     elif opt == "Release month heatmap":
         metric = st.selectbox("Metric", ("revenue", "vote_average"), index=0, format_func=lambda x: "Revenue" if x == "revenue" else "Rating")
-        st.altair_chart(chart_month_seasonality_heat(df, metric=metric), use_container_width=True)
+        render_chart(view, "month_seasonality_heat", (metric,), lambda: chart_month_seasonality_heat(df, metric=metric))
     elif opt == "Decade trends: Budget/Revenue/Rating":
-        st.altair_chart(chart_decade_multi_trend(df), use_container_width=True)
+        render_chart(view, "decade_multi_trend", (), lambda: chart_decade_multi_trend(df))
     elif opt == "Sequel vs Original Comparison":
-        st.altair_chart(chart_sequel_original_bar(df, metric="roi"), use_container_width=True)
+        render_chart(view, "sequel_original_bar", ("roi",), lambda: chart_sequel_original_bar(df, metric="roi"))
+
 
 
+def section_eda(df: pd.DataFrame, moments: Optional[Moments] = None, view: Optional[CrossView] = None) -> None:
+    from charts import (
+        CORR_COLUMNS,
+        chart_vote_hist,
+        chart_year_trend,
+        chart_runtime_box_by_genre,
+        chart_corr_heatmap,
+    )
+    from spec_cache import render_chart
 
-def section_eda(df: pd.DataFrame) -> None:
     st.subheader("Exploratory Data Analysis")
     c1, c2 = st.columns(2)
     with c1:
         st.markdown("Rating distribution")
-        st.altair_chart(chart_vote_hist(df), use_container_width=True)
+        render_chart(view, "vote_hist", (), lambda: chart_vote_hist(df))
     with c2:
         st.markdown("Yearly trend: average rating vs average popularity")
-        st.altair_chart(chart_year_trend(df), use_container_width=True)
+        render_chart(view, "year_trend", (), lambda: chart_year_trend(df))
 
     st.markdown("---")
     c3, c4 = st.columns(2)
     with c3:
         st.markdown("Runtime distribution of popular genres (boxplot)")
-        st.altair_chart(chart_runtime_box_by_genre(df), use_container_width=True)
+        render_chart(view, "runtime_box_by_genre", (), lambda: chart_runtime_box_by_genre(df))
     with c4:
         st.markdown("Feature correlation heatmap")
-        st.altair_chart(chart_corr_heatmap(df), use_container_width=True)
+
+        def corr_heatmap():
+            corr = None
+            if moments is not None:
+                corr = moments.corr_matrix([c for c in CORR_COLUMNS if c in df.columns])
+            return chart_corr_heatmap(df, corr_matrix=corr)
+
+        render_chart(view, "corr_heatmap", (), corr_heatmap)
 
 
 def section_leaderboard(df: pd.DataFrame) -> None:
@@ -177,3 +236,82 @@ def section_leaderboard(df: pd.DataFrame) -> None:
         }),
         use_container_width=True,
     )
+
+
+
+def section_people(df: pd.DataFrame) -> None:
+    st.subheader("Directors & Actors")
+    if not st.toggle("Show ROI leaderboards by director/actor (loads cast/crew credits)", value=False, key="people_on"):
+        return
+    from credits import ROLES, ROLE_LABELS, load_credits_index, person_roi_leaderboard
+
+    try:
+        index = load_credits_index()
+    except Exception:
+        st.info("Cast/crew credits are unavailable (tmdb_5000_credits.csv missing or download failed), so the leaderboards are hidden.")
+        return
+    c1, c2, c3 = st.columns(3)
+    role = c1.radio("Role", ROLES, format_func=lambda r: ROLE_LABELS[r], horizontal=True, key="people_role")
+    min_movies = c2.slider("Minimum movies", 1, 10, 3, key="people_min")
+    top_k = c3.slider("Top N", 5, 50, 20, key="people_top")
+    board = person_roi_leaderboard(df, index, role, min_movies=min_movies, top_k=top_k)
+    if board.empty:
+        st.info("No person has enough movies under current filters. Try lowering the minimum.")
+        return
+    st.dataframe(
+        board.style.format({"median_roi": "{:.2f}", "mean_roi": "{:.2f}"}),
+        use_container_width=True,
+    )
+
+
+def section_similar(df: pd.DataFrame, df_full: pd.DataFrame, version: int) -> None:
+    st.subheader("Similar Movies")
+    if not st.toggle("Find movies similar to a title (builds the similarity index)", value=False, key="similar_on"):
+        return
+    from similarity import get_similarity_index, query_similar, warm_similarity_index
+    from snapshot import get_snapshot_manager
+
+    # Once used, the index is built with each background refresh instead of on the first rerun after it
+    get_snapshot_manager().add_warmup("similarity", warm_similarity_index)
+    index = get_similarity_index(df_full, version)
+    c1, c2 = st.columns([2, 1])
+    needle = c1.text_input("Find a title", key="similar_search").strip()
+    pool = df_full if needle else df
+    if needle:
+        pool = pool[pool["title"].str.contains(needle, case=False, regex=False, na=False)]
+    # Offer the 50 most popular matches; positions address rows of the index
+    picks = pool.nlargest(50, "popularity")
+    if picks.empty:
+        st.info("No title matches the search.")
+        return
+    positions = df_full.index.get_indexer(picks.index)
+    labels = {
+        p: f"{t} ({int(y)})" if pd.notna(y) else str(t)
+        for p, t, y in zip(positions, picks["title"], picks["release_year"])
+    }
+    position = c1.selectbox("Movie", list(labels), format_func=labels.get, key="similar_pick")
+    k = c2.slider("Results", 5, 50, 10, key="similar_k")
+    within = c2.checkbox("Only within current filters", value=True, key="similar_within")
+
+    mask = None
+    if within:
+        mask = np.zeros(len(df_full), dtype=bool)
+        mask[df_full.index.get_indexer(df.index)] = True
+    hits = query_similar(index, position, k=k, mask=mask)
+    if hits.empty:
+        st.info("No other movie under current filters.")
+        return
+    cols = [c for c in ["title", "release_year", "genres_list", "budget", "revenue", "runtime", "vote_average"] if c in df_full.columns]
+    data = df_full.iloc[hits["position"].to_numpy()][cols].reset_index(drop=True)
+    data.insert(0, "similarity", 1.0 / (1.0 + hits["distance"].to_numpy()))
+    if "genres_list" in data.columns:
+        # The Styler renders cells with astype(str), which Arrow list columns do not support
+        data["genres_list"] = [", ".join(g) if g is not None else "" for g in data["genres_list"]]
+    data["genre_overlap"] = hits["genre_overlap"].to_numpy()
+    st.dataframe(
+        data.style.format({
+            "similarity": "{:.2f}", "budget": "${:,.0f}", "revenue": "${:,.0f}", "vote_average": "{:.1f}",
+            "genre_overlap": "{:.0%}",
+        }),
+        use_container_width=True,
+    )
@@ -0,0 +1,17 @@
+"""
+ASGI entry point: ``app.py`` plus the export route that streams large downloads from disk.
+
+    streamlit run serve.py          # or: uvicorn serve:app --port 8501
+
+Needs a Streamlit release with ``st.App``. ``streamlit run app.py`` still works without it;
+exports are then in-memory downloads limited to ``export.EXPORT_MAX_ROWS`` rows.
+"""
+from __future__ import annotations
+
+import os
+
+import streamlit as st
+
+from export import export_routes
+
+app = st.App(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), routes=export_routes())
@@ -0,0 +1,301 @@
+"""
+Shared, memory-mapped base table for multi-process deployments.
+
+A loader process cleans the dataset once and publishes it as an uncompressed Arrow IPC file,
+preferably on ``/dev/shm``:
+
+    python shared_table.py publish --path /dev/shm/tmdb_movies.arrow [--every 3600]
+
+Numeric columns are stored as plain buffers (NaN for missing), text as Arrow strings and list
+columns (genres, countries, ...) as Arrow ``list<string>``. The moment statistics (``moments.py``) go
+to a sidecar file, ``<path>.moments``, in the same format.
+
+Streamlit workers started with ``TMDB_SHARED_TABLE=<path>`` memory-map both files read-only instead of
+loading the CSV. The pages live once in the OS page cache however many workers attach. Numeric, text
+and list columns of each worker's frame are zero-copy views of the map (list columns as pandas
+``ArrowDtype`` lists, not Python lists), the moment statistics are views of the sidecar, and the
+sidebar mask is computed on the buffers directly. What stays per worker is small: the few derived columns
+with pandas-only dtypes, the similarity index when enabled, and the filtered rows of each rerun.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from data_loader import LoadResult
+from derived import add_derived_columns
+from filters import Filters, title_mask
+from moments import MomentStats, build_moment_stats
+
+SHARED_TABLE_PATH = os.environ.get("TMDB_SHARED_TABLE", "")
+DEFAULT_PATH = os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "tmdb_movies.arrow")
+_META_KEY = b"tmdb_shared"
+_MOMENTS_SUFFIX = ".moments"
+
+
+# ------------------------------
+# Publishing (loader process)
+# ------------------------------
+_LIST_TYPE = pa.list_(pa.string())
+
+
+def to_arrow(df: pd.DataFrame, version: int, source: str) -> pa.Table:
+    """Arrow table of the cleaned frame.
+
+    Registry columns with pandas-only dtypes (nullable ints, categories) are left out; workers
+    recompute them with ``add_derived_columns``.
+    """
+    arrays, names, lists = [], [], []
+    for name in df.columns:
+        col = df[name]
+        if name.endswith("_list") and col.dtype == object:
+            arr = pa.array([[str(x) for x in v] if isinstance(v, (list, tuple)) else [] for v in col], type=_LIST_TYPE)
+            lists.append(name)
+        elif isinstance(col.dtype, np.dtype) and col.dtype.kind in "fiub":
+            arr = pa.array(col.to_numpy())  # NaN stays NaN (not null), so workers can view it zero-copy
+        elif isinstance(col.dtype, np.dtype) and col.dtype.kind == "M":
+            arr = pa.Array.from_pandas(col)
+        elif col.dtype == object:
+            arr = pa.Array.from_pandas(col.astype(object).where(col.notna(), None), type=pa.string())
+        else:
+            continue
+        arrays.append(arr)
+        names.append(name)
+    meta = {"version": version, "source": source, "published_at": time.time(), "lists": lists}
+    return pa.Table.from_arrays(arrays, names=names).replace_schema_metadata({_META_KEY: json.dumps(meta)})
+
+
+def moments_to_arrow(stats: MomentStats, version: int) -> pa.Table:
+    """One row per partition: keys, row count and the flattened (k, k) sums; the rest in metadata."""
+    k = len(stats.columns)
+    arrays = {
+        "part_year": pa.array(stats.part_year),
+        "part_lang": pa.array(stats.part_lang.astype(str)),
+        "part_combo": pa.array(stats.part_combo),
+        "part_has_revenue": pa.array(stats.part_has_revenue),
+        "part_rows": pa.array(stats.part_rows),
+    }
+    for name in ("n", "s", "q", "p"):
+        flat = pa.array(np.ascontiguousarray(getattr(stats, name), dtype=np.float64).reshape(-1))
+        arrays[name] = pa.FixedSizeListArray.from_arrays(flat, k * k)
+    meta = {
+        "version": version,
+        "columns": list(stats.columns),
+        "shift": stats.shift.tolist(),
+        "genres": list(stats.genres),
+        "combo_genres": [np.flatnonzero(row).tolist() for row in stats.combo_genres],
+        "vote_bounds": list(stats.vote_bounds),
+        "runtime_bounds": list(stats.runtime_bounds) if stats.runtime_bounds is not None else None,
+        "vote_count_min": stats.vote_count_min,
+        "has_language": stats.has_language,
+        "has_revenue": stats.has_revenue,
+    }
+    return pa.table(arrays).replace_schema_metadata({_META_KEY: json.dumps(meta)})
+
+
+def _write_atomic(table: pa.Table, path: str) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def publish_table(
+    df: pd.DataFrame, path: str = DEFAULT_PATH, source: str = "", moments: Optional[MomentStats] = None
+) -> int:
+    """Write ``df`` and its moment statistics atomically (workers never see a partial file); returns the version.
+
+    The sidecar is replaced first; a worker that attaches in between sees mismatched versions and
+    computes the statistics itself.
+    """
+    version = int(time.time() * 1000)
+    stats = moments if moments is not None else build_moment_stats(df)
+    _write_atomic(moments_to_arrow(stats, version), path + _MOMENTS_SUFFIX)
+    _write_atomic(to_arrow(df, version, source), path)
+    return version
+
+
+# ------------------------------
+# Attaching (Streamlit workers)
+# ------------------------------
+@dataclass
+class SharedTable:
+    """Read-only view of a published table; arrays are backed by the memory map."""
+    table: pa.Table
+    lists: List[str]
+    version: int
+    source: str
+    path: str
+    published_at: float
+
+    @property
+    def num_rows(self) -> int:
+        return self.table.num_rows
+
+    def numpy(self, name: str) -> np.ndarray:
+        """Zero-copy, read-only NumPy view of a numeric column."""
+        return self.table.column(name).chunk(0).to_numpy(zero_copy_only=True)
+
+    def _any_of(self, name: str, values: Sequence[str]) -> np.ndarray:
+        arr = self.table.column(name).chunk(0)
+        hit = pc.fill_null(pc.is_in(arr.values, value_set=pa.array(list(values), type=pa.string())), False)
+        # Matches per row from a running count over the items (empty lists count 0)
+        seen = np.concatenate([[0], np.cumsum(hit.to_numpy(zero_copy_only=False), dtype=np.int32)])
+        offsets = arr.offsets.to_numpy()
+        return seen[offsets[1:]] > seen[offsets[:-1]]
+
+    def _has(self, name: str) -> bool:
+        return name in self.table.column_names
+
+    def filter_mask(self, f: Filters) -> np.ndarray:
+        """``filters.filter_mask`` computed on the shared buffers (boolean array over all rows)."""
+        year = self.numpy("release_year")
+        mask = (year >= f.years[0]) & (year <= f.years[1])
+
+        if f.genres:
+            mask &= self._any_of("genres_list", f.genres)
+
+        if f.languages and self._has("original_language"):
+            lang = pc.is_in(self.table.column("original_language"), value_set=pa.array(f.languages))
+            mask &= pc.fill_null(lang, False).to_numpy()
+
+        vote = self.numpy("vote_average")
+        mask &= (vote >= f.vote_range[0]) & (vote <= f.vote_range[1])
+
+        runtime = self.numpy("runtime")
+        if not np.isnan(runtime).all():
+            mask &= (runtime >= f.runtime_range[0]) & (runtime <= f.runtime_range[1])
+
+        roi = self.numpy("roi")
+        if not np.isnan(roi).all() and f.roi_min > 0:
+            mask &= roi >= f.roi_min
+
+        if self._has("vote_count") and f.min_votes > 0:
+            mask &= self.numpy("vote_count") >= f.min_votes
+
+        if f.exclude_zero_revenue and self._has("revenue"):
+            mask &= np.nan_to_num(self.numpy("revenue")) > 0
+
+        if f.title_kw:
+            # Python ``re`` like the pandas path (Arrow's RE2 rejects e.g. lookaheads)
+            mask &= title_mask(self.table.column("title").to_pylist(), f.title_kw)
+
+        if f.person_id is not None and self._has("id"):
+            from credits import load_credits_index
+
+            mask &= np.isin(self.numpy("id"), load_credits_index().movies_for(f.person_id, f.person_role))
+
+        return mask
+
+    def to_pandas(self) -> pd.DataFrame:
+        """Cleaned frame with zero-copy numeric/text/list columns plus the derived columns not stored."""
+        # ArrowDtype wraps the mapped buffers as they are (StringDtype("pyarrow") would copy to large_string)
+        types = {pa.string(): pd.ArrowDtype(pa.string()), _LIST_TYPE: pd.ArrowDtype(_LIST_TYPE)}
+        df = self.table.to_pandas(split_blocks=True, types_mapper=types.get)
+        return add_derived_columns(df)
+
+
+def _map_table(path: str) -> Tuple[pa.Table, dict]:
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table, json.loads(table.schema.metadata[_META_KEY])
+
+
+def attach_table(path: str) -> SharedTable:
+    """Memory-map a published table read-only."""
+    table, meta = _map_table(path)
+    return SharedTable(
+        table=table,
+        lists=meta["lists"],
+        version=int(meta["version"]),
+        source=meta["source"],
+        path=path,
+        published_at=float(meta["published_at"]),
+    )
+
+
+def attach_moments(path: str, version: int) -> Optional[MomentStats]:
+    """Moment statistics published with table ``version`` at ``path``; None when missing or of another version."""
+    try:
+        table, meta = _map_table(path + _MOMENTS_SUFFIX)
+    except (OSError, KeyError, TypeError, pa.ArrowInvalid):
+        return None
+    if int(meta["version"]) != version:
+        return None
+    k = len(meta["columns"])
+
+    def column(name: str) -> np.ndarray:
+        return table.column(name).chunk(0).to_numpy(zero_copy_only=False)
+
+    def sums(name: str) -> np.ndarray:
+        return table.column(name).chunk(0).values.to_numpy(zero_copy_only=True).reshape(-1, k, k)
+
+    genres = tuple(meta["genres"])
+    combo_genres = np.zeros((len(meta["combo_genres"]), len(genres)), dtype=bool)
+    for ci, members in enumerate(meta["combo_genres"]):
+        combo_genres[ci, members] = True
+    return MomentStats(
+        columns=tuple(meta["columns"]),
+        shift=np.asarray(meta["shift"], dtype=np.float64),
+        part_year=column("part_year"),
+        part_lang=column("part_lang").astype(object),
+        part_combo=column("part_combo"),
+        part_has_revenue=column("part_has_revenue").astype(bool),
+        part_rows=column("part_rows"),
+        genres=genres,
+        combo_genres=combo_genres,
+        n=sums("n"),
+        s=sums("s"),
+        q=sums("q"),
+        p=sums("p"),
+        vote_bounds=tuple(meta["vote_bounds"]),
+        runtime_bounds=tuple(meta["runtime_bounds"]) if meta["runtime_bounds"] is not None else None,
+        vote_count_min=meta["vote_count_min"],
+        has_language=bool(meta["has_language"]),
+        has_revenue=bool(meta["has_revenue"]),
+    )
+
+
+def load_shared_table(path: Optional[str] = None) -> LoadResult:
+    """Snapshot builder for workers: attach to the latest published table and its moment statistics."""
+    shared = attach_table(path or SHARED_TABLE_PATH)
+    df = shared.to_pandas()
+    moments = attach_moments(shared.path, shared.version)
+    if moments is None:
+        moments = build_moment_stats(df)
+    return LoadResult(df=df, source=f"{shared.path} (shared, {shared.source})", moments=moments, shared=shared)
+
+
+# ------------------------------
+# Loader CLI
+# ------------------------------
+def main(argv: Sequence[str] = ()) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["publish"])
+    parser.add_argument("--path", default=SHARED_TABLE_PATH or DEFAULT_PATH, help="output Arrow file")
+    parser.add_argument("--every", type=float, default=0.0, help="republish every N seconds (0 = once)")
+    args = parser.parse_args(list(argv))
+
+    from data_loader import read_tmdb_movies
+
+    while True:
+        res = read_tmdb_movies()
+        version = publish_table(res.df, args.path, source=res.source, moments=res.moments)
+        print(f"published {res.df.shape[0]:,} rows to {args.path} (version {version})", flush=True)
+        if args.every <= 0:
+            return 0
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,151 @@
+"""
+"Similar movies": nearest-neighbour search over numeric and genre/country features.
+
+The index keeps one float32 matrix per catalog: standardized numeric features (log budget, log
+revenue, runtime, rating, log popularity) followed by multi-hot genre and country columns. A query is
+one blocked matrix product per block of rows plus ``argpartition``, so it stays exact and needs no
+extra structure. The search can be restricted to the rows of the current filter selection.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from derived import derived_column
+
+if TYPE_CHECKING:
+    from snapshot import Snapshot
+
+NUMERIC_FEATURES: Tuple[str, ...] = ("log_budget", "log_revenue", "runtime", "vote_average", "log_popularity")
+MAX_COUNTRIES = 32
+BLOCK_ROWS = 1 << 17
+# Weights of the three distance terms (numeric distance per feature, 1 - Jaccard for genres/countries)
+DEFAULT_WEIGHTS: Dict[str, float] = {"numeric": 1.0, "genres": 1.0, "countries": 0.5}
+
+
+@dataclass
+class SimilarityIndex:
+    """Feature matrix aligned with the rows (positions) of the table it was built from."""
+    features: np.ndarray        # (n, d) float32: [numeric | genres | countries]
+    sq_norm: np.ndarray         # (n,) float32, squared norm of the numeric block
+    genre_count: np.ndarray     # (n,) float32
+    country_count: np.ndarray   # (n,) float32
+    n_numeric: int
+    genres: Tuple[str, ...]
+    countries: Tuple[str, ...]
+
+    @property
+    def size(self) -> int:
+        return self.features.shape[0]
+
+
+def _multi_hot(lists: pd.Series, vocab: List[str]) -> np.ndarray:
+    """(n, len(vocab)) 0/1 matrix of list membership; items outside ``vocab`` are ignored."""
+    items = lists.reset_index(drop=True).explode()
+    codes = pd.Categorical(items.to_numpy(), categories=vocab).codes
+    rows = items.index.to_numpy()
+    keep = codes >= 0
+    out = np.zeros((len(lists), len(vocab)), dtype=np.float32)
+    out[rows[keep], codes[keep]] = 1.0
+    return out
+
+
+def build_similarity_index(df: pd.DataFrame) -> SimilarityIndex:
+    """Build the index over ``df`` (cleaned table); rows are addressed by position."""
+    num = pd.DataFrame({
+        "log_budget": derived_column(df, "log_budget"),
+        "log_revenue": derived_column(df, "log_revenue"),
+        "runtime": df["runtime"],
+        "vote_average": df["vote_average"],
+        "log_popularity": np.log1p(df["popularity"].clip(lower=0)),
+    }).astype("float64")
+    # Standardize; missing values sit at the mean (0) so they neither attract nor repel
+    z = ((num - num.mean()) / num.std(ddof=0).replace(0, 1.0)).fillna(0.0).to_numpy(dtype=np.float32)
+
+    genres = sorted(df["genres_list"].explode().dropna().unique())
+    countries = df["production_countries_list"].explode().value_counts().head(MAX_COUNTRIES).index.tolist()
+    g = _multi_hot(df["genres_list"], genres)
+    c = _multi_hot(df["production_countries_list"], countries)
+
+    return SimilarityIndex(
+        features=np.ascontiguousarray(np.hstack([z, g, c]), dtype=np.float32),
+        sq_norm=(z * z).sum(axis=1).astype(np.float32),
+        genre_count=g.sum(axis=1),
+        country_count=c.sum(axis=1),
+        n_numeric=z.shape[1],
+        genres=tuple(genres),
+        countries=tuple(countries),
+    )
+
+
+def query_similar(
+    index: SimilarityIndex,
+    position: int,
+    k: int = 10,
+    mask: Optional[np.ndarray] = None,
+    weights: Optional[Dict[str, float]] = None,
+) -> pd.DataFrame:
+    """Top-``k`` rows closest to row ``position`` (itself excluded), optionally only where ``mask``.
+
+    Returns positions with the total distance and the genre/country Jaccard overlaps, best first.
+    """
+    w = {**DEFAULT_WEIGHTS, **(weights or {})}
+    p = index.n_numeric
+    n_g = len(index.genres)
+    q = index.features[position]
+    # One product gives numeric dot, genre intersection and country intersection per row
+    proj = np.zeros((index.features.shape[1], 3), dtype=np.float32)
+    proj[:p, 0] = q[:p]
+    proj[p:p + n_g, 1] = q[p:p + n_g]
+    proj[p + n_g:, 2] = q[p + n_g:]
+    q_sq, q_g, q_c = index.sq_norm[position], index.genre_count[position], index.country_count[position]
+
+    best_pos: List[np.ndarray] = []
+    best_dist: List[np.ndarray] = []
+    for start in range(0, index.size, BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, index.size)
+        dots = index.features[start:stop] @ proj
+        num_d = np.maximum(index.sq_norm[start:stop] + q_sq - 2 * dots[:, 0], 0) / p
+        with np.errstate(invalid="ignore", divide="ignore"):
+            jac_g = dots[:, 1] / (index.genre_count[start:stop] + q_g - dots[:, 1])
+            jac_c = dots[:, 2] / (index.country_count[start:stop] + q_c - dots[:, 2])
+        jac_g = np.nan_to_num(jac_g)
+        jac_c = np.nan_to_num(jac_c)
+        dist = w["numeric"] * num_d + w["genres"] * (1 - jac_g) + w["countries"] * (1 - jac_c)
+        if mask is not None:
+            dist[~mask[start:stop]] = np.inf
+        if start <= position < stop:
+            dist[position - start] = np.inf
+        kk = min(k, len(dist))
+        top = np.argpartition(dist, kk - 1)[:kk] if kk else np.empty(0, dtype=np.int64)
+        top = top[np.isfinite(dist[top])]
+        best_pos.append(top + start)
+        best_dist.append(dist[top])
+
+    pos = np.concatenate(best_pos) if best_pos else np.empty(0, dtype=np.int64)
+    dist = np.concatenate(best_dist) if best_dist else np.empty(0, dtype=np.float32)
+    order = np.argsort(dist, kind="stable")[:k]
+    pos, dist = pos[order], dist[order]
+
+    feats = index.features[pos]
+    inter_g = feats[:, p:p + n_g] @ q[p:p + n_g]
+    inter_c = feats[:, p + n_g:] @ q[p + n_g:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        jac_g = np.nan_to_num(inter_g / (index.genre_count[pos] + q_g - inter_g))
+        jac_c = np.nan_to_num(inter_c / (index.country_count[pos] + q_c - inter_c))
+    return pd.DataFrame({"position": pos, "distance": dist, "genre_overlap": jac_g, "country_overlap": jac_c})
+
+
+@st.cache_resource(show_spinner="Building similarity index...", max_entries=2)
+def get_similarity_index(_df: pd.DataFrame, version: int) -> SimilarityIndex:
+    """Index of a snapshot table, built once per dataset version."""
+    return build_similarity_index(_df)
+
+
+def warm_similarity_index(snap: Snapshot) -> None:
+    """Snapshot warmup: build the index of a new snapshot before it is swapped in."""
+    get_similarity_index(snap.df, snap.version)
@@ -0,0 +1,179 @@
+"""
+Versioned dataset snapshots with background rebuild and atomic hot swap.
+
+One ``SnapshotManager`` per server process (``st.cache_resource``) owns the current ``Snapshot``:
+the cleaned table plus everything derived from it at load. A refresh rebuilds a new snapshot in a
+worker thread while sessions keep rendering the current one; the new snapshot then replaces it in a
+single reference assignment. Reruns started after the swap see the new version. Each session pins the
+snapshot it rendered in ``session_state``, so the old snapshot is freed once every session has rerun
+on the new one (tracked with weak references).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+import os
+import threading
+import time
+import weakref
+
+import pandas as pd
+import streamlit as st
+
+from data_loader import LoadResult, read_tmdb_movies
+from moments import MomentStats
+
+if TYPE_CHECKING:
+    from shared_table import SharedTable
+
+# Rebuild automatically when the current snapshot is older than this many seconds (0 = manual only)
+AUTO_REFRESH_S = float(os.environ.get("TMDB_REFRESH_INTERVAL_S", "0"))
+
+
+@dataclass(frozen=True, eq=False)
+class Snapshot:
+    """Immutable, versioned dataset state; treat ``df`` as read-only."""
+    version: int
+    data: LoadResult
+    built_at: float
+    build_seconds: float
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self.data.df
+
+    @property
+    def moments(self) -> Optional[MomentStats]:
+        return self.data.moments
+
+    @property
+    def source(self) -> str:
+        return self.data.source
+
+    @property
+    def shared(self) -> Optional[SharedTable]:
+        return self.data.shared
+
+
+@dataclass
+class SnapshotStatus:
+    version: Optional[int]
+    building: bool
+    last_error: Optional[str]
+    retired_alive: List[int]
+
+
+class SnapshotManager:
+    """Holds the current snapshot and rebuilds it in the background on demand."""
+
+    def __init__(self, builder: Callable[[], LoadResult] = read_tmdb_movies, auto_refresh_s: float = AUTO_REFRESH_S):
+        self._builder = builder
+        self._auto_refresh_s = auto_refresh_s
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._current: Optional[Snapshot] = None
+        self._retired: "weakref.WeakValueDictionary[int, Snapshot]" = weakref.WeakValueDictionary()
+        self._worker: Optional[threading.Thread] = None
+        self._last_error: Optional[str] = None
+        self._last_attempt = 0.0
+        self._next_version = 1
+        self._warmups: Dict[str, Callable[[Snapshot], Any]] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self._current is not None
+
+    def _build(self) -> Snapshot:
+        t0 = time.perf_counter()
+        data = self._builder()
+        with self._lock:
+            version = self._next_version
+            self._next_version += 1
+        return Snapshot(version=version, data=data, built_at=time.time(), build_seconds=time.perf_counter() - t0)
+
+    def _swap(self, snap: Snapshot) -> None:
+        with self._lock:
+            old, self._current = self._current, snap
+            if old is not None:
+                self._retired[old.version] = old
+
+    def current(self) -> Snapshot:
+        """Current snapshot; the very first call builds it synchronously (once per process)."""
+        snap = self._current
+        if snap is None:
+            with self._build_lock:
+                if self._current is None:
+                    self._swap(self._build())
+            snap = self._current
+        elif self._auto_refresh_s > 0 and time.time() - max(snap.built_at, self._last_attempt) > self._auto_refresh_s:
+            # Measured from the last attempt too, so a failing source is retried once per interval
+            self.refresh()
+        return snap
+
+    def refresh(self) -> bool:
+        """Start a background rebuild; False if one is already running."""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return False
+            self._last_attempt = time.time()
+            self._worker = threading.Thread(target=self._rebuild, name="snapshot-rebuild", daemon=True)
+            self._worker.start()
+        return True
+
+    def _rebuild(self) -> None:
+        with self._build_lock:
+            try:
+                snap = self._build()
+            except Exception as exc:  # keep serving the current snapshot
+                self._last_error = f"{type(exc).__name__}: {exc}"
+                return
+            self._warm(snap)
+            self._last_error = None
+            self._swap(snap)
+
+    def add_warmup(self, name: str, warm: Callable[[Snapshot], Any]) -> None:
+        """Run ``warm(snapshot)`` on every rebuilt snapshot before it is swapped in.
+
+        Features register their per-version structures when first used (e.g. the similarity index), so
+        the first session after a refresh finds them built instead of building them in its rerun.
+        """
+        with self._lock:
+            self._warmups[name] = warm
+
+    def _warm(self, snap: Snapshot) -> None:
+        with self._lock:
+            warmups = list(self._warmups.values())
+        for warm in warmups:
+            try:
+                warm(snap)
+            except Exception:  # the feature builds it on first use instead
+                pass
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until a running background rebuild finishes (tests, scripts)."""
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def status(self) -> SnapshotStatus:
+        worker = self._worker
+        return SnapshotStatus(
+            version=self._current.version if self._current is not None else None,
+            building=worker is not None and worker.is_alive(),
+            last_error=self._last_error,
+            retired_alive=sorted(self._retired.keys()),
+        )
+
+
+@st.cache_resource(show_spinner=False)
+def get_snapshot_manager() -> SnapshotManager:
+    """Process-wide snapshot manager shared by all sessions.
+
+    With ``TMDB_SHARED_TABLE`` set, snapshots attach to the table published by the loader process
+    (``shared_table.py``) instead of reading the CSV.
+    """
+    if os.environ.get("TMDB_SHARED_TABLE"):
+        from shared_table import load_shared_table
+
+        return SnapshotManager(builder=load_shared_table)
+    return SnapshotManager()
@@ -0,0 +1,123 @@
+"""
+Cache of serialized Vega-Lite chart specs.
+
+A chart is a pure function of (dataset version, sidebar filters, cross-filter, chart name, params).
+The cache stores each chart's serialized form under that key in a process-wide LRU bounded by a byte
+budget. A hit is drawn with ``st.vega_lite_chart`` without calling the chart builder, which skips
+both the pandas aggregation and the Altair conversion/validation.
+
+The serialized form is the compact JSON spec plus its named datasets as Arrow IPC bytes, which is
+what Streamlit sends to the browser. Rows inlined as JSON would have to be parsed and re-encoded to
+Arrow on every hit.
+"""
+from __future__ import annotations
+
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+
+import streamlit as st
+
+from lru import LRUCache
+
+if TYPE_CHECKING:
+    import altair as alt
+
+    from crossfilter import CrossView
+
+SPEC_CACHE_MB = float(os.environ.get("TMDB_SPEC_CACHE_MB", "64"))
+
+# Altair's theme and data transformer are process globals. Every Altair conversion in the app (the
+# spec cache's and ``st.altair_chart``'s) runs under this lock so they never see each other's settings.
+_ALTAIR_LOCK = threading.Lock()
+_TRANSFORMER = "tmdb_arrow_datasets"
+_registered = False
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    """Compact Vega-Lite JSON (data referenced by name) and its datasets as Arrow IPC stream bytes."""
+    spec_json: str
+    datasets: Dict[str, bytes]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.spec_json) + sum(len(b) for b in self.datasets.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Spec for ``st.vega_lite_chart`` (Streamlit passes Arrow bytes datasets through as-is)."""
+        spec = json.loads(self.spec_json)
+        spec["datasets"] = dict(self.datasets)
+        return spec
+
+
+@st.cache_resource(show_spinner=False)
+def get_spec_cache() -> LRUCache:
+    """Process-wide spec cache shared by all sessions (``TMDB_SPEC_CACHE_MB``, default 64 MB)."""
+    return LRUCache(int(SPEC_CACHE_MB * 1024 * 1024), sizeof=lambda spec: spec.nbytes)
+
+
+def _arrow_dataset(data: Any, datasets: Dict[str, bytes]) -> Dict[str, str]:
+    """Altair data transformer: store ``data`` as Arrow IPC bytes under a content-hash name."""
+    import pandas as pd
+    import pyarrow as pa
+
+    frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+    try:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns: ship them as text
+        obj = frame.select_dtypes(include="object").columns
+        table = pa.Table.from_pandas(frame.astype({c: str for c in obj}), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.RecordBatchStreamWriter(sink, table.schema) as writer:
+        writer.write_table(table)
+    payload = sink.getvalue().to_pybytes()
+    name = "data-" + hashlib.md5(payload).hexdigest()
+    datasets[name] = payload
+    return {"name": name}
+
+
+def chart_to_spec(chart: "alt.TopLevelMixin") -> ChartSpec:
+    """Serialize ``chart`` like ``st.altair_chart`` does: no default theme, data as Arrow datasets."""
+    global _registered
+    import altair as alt
+
+    datasets: Dict[str, bytes] = {}
+    with _ALTAIR_LOCK:
+        if not _registered:
+            alt.data_transformers.register(_TRANSFORMER, _arrow_dataset)
+            _registered = True
+        # Like st.altair_chart: drop Altair's default theme, but keep a theme the app enabled itself
+        theme = alt.theme.enable("none") if alt.theme.active == "default" else nullcontext()
+        with theme, alt.data_transformers.enable(_TRANSFORMER, datasets=datasets):
+            spec = chart.to_dict()
+    spec.pop("datasets", None)
+    return ChartSpec(spec_json=json.dumps(spec, separators=(",", ":")), datasets=datasets)
+
+
+def render_chart(
+    view: Optional[CrossView],
+    name: str,
+    params: Tuple,
+    build: Callable[[], "alt.TopLevelMixin"],
+    exclude: Optional[str] = None,
+    **kwargs: Any,
+) -> Any:
+    """Draw the chart ``build()`` through the spec cache; without a view it is drawn directly.
+
+    ``params`` must hold every input of ``build`` besides the view's rows. ``exclude`` names the
+    cross-filter source whose selection the chart ignores. ``kwargs`` go to the Streamlit call
+    (``on_select``, ``key``). ``view=None`` draws with ``st.altair_chart``, holding the Altair lock.
+    """
+    if view is None:
+        chart = build()
+        with _ALTAIR_LOCK:
+            return st.altair_chart(chart, use_container_width=True, **kwargs)
+    key = view.cache_key(name, params, exclude)
+    spec = get_spec_cache().get_or_compute(key, lambda: chart_to_spec(build()))
+    return st.vega_lite_chart(spec.to_dict(), use_container_width=True, **kwargs)
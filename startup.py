@@ -0,0 +1,123 @@
+"""
+Startup profiling: per-module import-time report and a time-to-first-paint budget check.
+
+    python startup.py                # import-time report + first-paint check (budget STARTUP_BUDGET_S, 2 s)
+    python startup.py --budget 1.5   # same check with a 1.5 s budget
+
+Both exit 1 if first paint is over budget or a deferred module loads early; ``tests/test_startup.py``
+runs the same check under pytest.
+
+First paint is measured in a fresh interpreter as the time to import ``app`` and draw the header and
+loading skeleton (``render_header`` + ``render_skeleton``), which is what the browser sees first.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Modules that must not be imported before the header is drawn
+DEFERRED_MODULES: Tuple[str, ...] = ("kagglehub", "altair", "pyarrow", "charts", "data_loader", "snapshot", "shared_table", "credits", "similarity")
+# Modules profiled by the import-time report
+REPORT_MODULES: Tuple[str, ...] = (
+    "streamlit", "pandas", "numpy", "kagglehub", "altair", "pyarrow",
+    "data_loader", "filters", "moments", "components", "export", "charts", "sections", "snapshot", "credits", "similarity", "spec_cache",
+)
+STARTUP_BUDGET_S = float(os.environ.get("STARTUP_BUDGET_S", "2.0"))
+
+_FIRST_PAINT_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+import app
+app.render_header()
+app.render_skeleton()
+elapsed = time.perf_counter() - t0
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_ms: float
+    cumulative_ms: float
+
+
+@dataclass
+class FirstPaint:
+    seconds: float
+    early_imports: List[str]
+
+
+def _run(code: str, *args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    return subprocess.run(
+        [sys.executable, *args, "-c", code], cwd=APP_DIR, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def import_time_report(modules: Sequence[str] = REPORT_MODULES) -> List[ImportTiming]:
+    """Cold import time per module, each in a fresh interpreter (``python -X importtime``).
+
+    Cumulative time includes everything the module pulls in that was not already loaded, so a
+    module's cost is reported as if it were the first import of the process.
+    """
+    out: List[ImportTiming] = []
+    for name in modules:
+        try:
+            proc = _run(f"import {name}", "-X", "importtime")
+        except subprocess.CalledProcessError:
+            continue
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            parts = [p.strip() for p in line[len("import time:"):].split("|")]
+            if parts[2] == name:
+                out.append(ImportTiming(name, int(parts[0]) / 1000, int(parts[1]) / 1000))
+                break
+    return sorted(out, key=lambda t: t.cumulative_ms, reverse=True)
+
+
+def measure_first_paint(runs: int = 3) -> FirstPaint:
+    """Best-of-``runs`` time to first paint in a fresh interpreter, plus deferred modules seen."""
+    best = None
+    early: List[str] = []
+    for _ in range(runs):
+        proc = _run(_FIRST_PAINT_SNIPPET)
+        res = json.loads(proc.stdout.strip().splitlines()[-1])
+        best = res["seconds"] if best is None else min(best, res["seconds"])
+        early = [m for m in DEFERRED_MODULES if m in res["modules"]]
+    return FirstPaint(seconds=float(best), early_imports=early)
+
+
+def main(argv: Sequence[str] = ()) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_S, help="time-to-first-paint budget in seconds")
+    parser.add_argument("--no-report", action="store_true", help="skip the per-module import report")
+    args = parser.parse_args(list(argv))
+
+    if not args.no_report:
+        print(f"{'module':<14}{'self ms':>10}{'cumulative ms':>16}")
+        for t in import_time_report():
+            print(f"{t.module:<14}{t.self_ms:>10.1f}{t.cumulative_ms:>16.1f}")
+        print()
+
+    fp = measure_first_paint()
+    print(f"time to first paint: {fp.seconds:.3f} s (budget {args.budget:.3f} s)")
+    ok = True
+    if fp.early_imports:
+        print(f"FAIL: deferred modules imported before first paint: {', '.join(fp.early_imports)}")
+        ok = False
+    if fp.seconds > args.budget:
+        print("FAIL: time to first paint over budget")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
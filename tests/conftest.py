@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+# The app is a flat set of modules at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def movies():
+    """Cleaned synthetic table with derived columns (empty lists, zero budgets and gaps included)."""
+    from data_loader import clean_movies
+    from derived import add_derived_columns
+    from loadtest import make_synthetic_movies
+
+    return add_derived_columns(clean_movies(make_synthetic_movies(2000, seed=1)))
+
+
+@pytest.fixture(scope="session")
+def make_filters():
+    """``make_filters(df, **overrides)``: sidebar defaults (no-op ranges over ``df``) with overrides."""
+    from filters import Filters
+
+    def make(df, **overrides):
+        f = Filters(
+            years=(int(df["release_year"].min()), int(df["release_year"].max())),
+            genres=[],
+            vote_range=(float(df["vote_average"].min()), float(df["vote_average"].max())),
+            runtime_range=(float(df["runtime"].min()), float(df["runtime"].max())),
+            languages=[],
+            roi_min=0.0,
+            min_votes=int(df["vote_count"].min()),
+            exclude_zero_revenue=True,
+            title_kw="",
+        )
+        for k, v in overrides.items():
+            setattr(f, k, v)
+        return f
+
+    return make
@@ -0,0 +1,108 @@
+"""The NumPy binning engine must agree with the pandas/NumPy operations it replaces."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from binning import assign_bins, binned_stats, five_number_summary, nice_edges, quantile_edges
+
+
+def _values(kind, seed=0):
+    rng = np.random.default_rng(seed)
+    if kind == "lognormal":
+        v = rng.lognormal(16, 1.5, 3000)
+    elif kind == "ties":
+        # Few distinct values: many quantile edges coincide and are dropped
+        v = rng.choice([0.0, 0.0, 0.0, 1.0, 2.0, 2.0, 5.0, 10.0], 2000)
+    else:
+        v = rng.normal(6.2, 1.1, 2500).round(1)
+    v[rng.random(len(v)) < 0.03] = np.nan
+    return v
+
+
+KINDS = ["lognormal", "ties", "rounded"]
+
+
+@pytest.mark.parametrize("kind", KINDS)
+@pytest.mark.parametrize("q", [4, 10])
+def test_quantile_bins_match_qcut(kind, q):
+    v = _values(kind)
+    edges = quantile_edges(v, q)
+    expected, expected_edges = pd.qcut(v, q, labels=False, retbins=True, duplicates="drop")
+    np.testing.assert_allclose(edges, expected_edges)
+    codes = assign_bins(v, edges)
+    np.testing.assert_array_equal(codes, np.where(np.isnan(expected), -1, expected).astype(np.int64))
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_binned_stats_match_groupby(kind):
+    v = _values(kind, seed=1)
+    codes = np.random.default_rng(2).integers(-1, 12, len(v))
+    # One single-value group (std undefined); groups 12 and 13 stay empty
+    codes[codes == 11] = 10
+    codes[0] = 11
+    v[0] = 1.0
+    stats = binned_stats(v, codes, 14)
+
+    keep = codes >= 0
+    expected = pd.Series(v[keep]).groupby(codes[keep]).agg(["count", "mean", "std", "median"])
+    present = stats.loc[expected.index]
+    np.testing.assert_array_equal(present["n"], expected["count"])
+    np.testing.assert_allclose(present["mean"], expected["mean"], rtol=1e-12)
+    np.testing.assert_allclose(present["std"], expected["std"], rtol=1e-9)
+    np.testing.assert_allclose(present["median"], expected["median"], rtol=1e-12)
+    assert np.isnan(stats.loc[11, "std"])
+    assert stats.loc[[12, 13], "n"].tolist() == [0, 0]
+    assert stats.loc[[12, 13], ["mean", "std", "median"]].isna().all().all()
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_five_number_summary_matches_percentile(kind):
+    v = _values(kind, seed=3)
+    codes = np.random.default_rng(4).integers(0, 5, len(v))
+    summary = five_number_summary(v, codes, 6)
+    for g in range(5):
+        x = v[(codes == g) & ~np.isnan(v)]
+        q = np.percentile(x, [0, 25, 50, 75, 100])
+        np.testing.assert_allclose(summary.loc[g, ["min", "q1", "median", "q3", "max"]].to_numpy(dtype=float), q)
+        iqr = q[3] - q[1]
+        inside = x[(x >= q[1] - 1.5 * iqr) & (x <= q[3] + 1.5 * iqr)]
+        assert summary.loc[g, "lower"] == inside.min()
+        assert summary.loc[g, "upper"] == inside.max()
+        assert summary.loc[g, "n"] == len(x)
+    assert summary.loc[5, "n"] == 0
+    assert summary.loc[5, ["min", "q1", "median", "q3", "max", "lower", "upper"]].isna().all()
+
+
+@pytest.mark.parametrize("kind", KINDS)
+@pytest.mark.parametrize("maxbins", [10, 20, 40])
+def test_nice_edges_match_histogram(kind, maxbins):
+    v = _values(kind, seed=5)
+    edges = nice_edges(v, maxbins)
+    finite = v[~np.isnan(v)]
+    assert edges[0] <= finite.min() and edges[-1] >= finite.max()
+    assert len(edges) - 1 <= maxbins
+    # Vega-Lite steps are 1, 2 or 5 times a power of ten
+    step = edges[1] - edges[0]
+    np.testing.assert_allclose(np.diff(edges), step)
+    mantissa = step / 10 ** np.floor(np.log10(step))
+    assert min(abs(mantissa - m) for m in (1, 2, 5, 10)) < 1e-9
+
+    codes = assign_bins(v, edges, right=False)
+    counts = np.bincount(codes[codes >= 0], minlength=len(edges) - 1)
+    expected, _ = np.histogram(finite, bins=edges)
+    np.testing.assert_array_equal(counts, expected)
+    assert (codes[np.isnan(v)] == -1).all()
+
+
+@pytest.mark.parametrize(
+    "extent, maxbins, start, stop, step",
+    [
+        # Worked through Vega's bin(): step 10^(round(log10 span) - ceil(log10 maxbins)), grown, then divided by 5/2
+        ((0.0, 10.0), 20, 0.0, 10.0, 0.5),
+        ((40.0, 240.0), 10, 40.0, 240.0, 20.0),
+        ((1930.0, 2017.0), 20, 1930.0, 2020.0, 5.0),
+    ],
+)
+def test_nice_edges_match_vega_bin(extent, maxbins, start, stop, step):
+    edges = nice_edges(np.array(extent), maxbins)
+    np.testing.assert_allclose(edges, np.arange(start, stop + step / 2, step))
@@ -0,0 +1,77 @@
+"""Credits index construction (CSR postings), lookups and the person ROI leaderboard."""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from credits import build_credits_index, person_roi_leaderboard
+
+
+def _cast(*people):
+    return json.dumps([{"id": pid, "name": name, "character": "x"} for pid, name in people])
+
+
+def _crew(*people):
+    return json.dumps([{"id": pid, "name": name, "job": job} for pid, name, job in people])
+
+
+@pytest.fixture(scope="module")
+def index():
+    raw = pd.DataFrame({
+        "movie_id": [30, 10, 20, 40],
+        "cast": [
+            _cast((7, "Cid"), (5, "Ann")),
+            # Ann credited twice in movie 10 (two characters)
+            _cast((5, "Ann"), (3, "Bo"), (5, "Ann")),
+            _cast((5, "Ann")),
+            "not json",
+        ],
+        "crew": [
+            _crew((9, "Dee", "Director")),
+            _crew((9, "Dee", "Director"), (3, "Bo", "Editor")),
+            _crew((3, "Bo", "Director")),
+            _crew((9, "Dee", "Director")),
+        ],
+    })
+    return build_credits_index(raw)
+
+
+def test_csr_postings(index):
+    np.testing.assert_array_equal(index.person_ids, [3, 5, 7, 9])
+    np.testing.assert_array_equal(index.person_names, ["Bo", "Ann", "Cid", "Dee"])
+    # Duplicate credits collapse; postings are sorted movie ids; unparsable rows are skipped
+    np.testing.assert_array_equal(index.cast_indptr, [0, 1, 4, 5, 5])
+    np.testing.assert_array_equal(index.cast_movies, [10, 10, 20, 30, 30])
+    np.testing.assert_array_equal(index.director_indptr, [0, 1, 1, 1, 3])
+    np.testing.assert_array_equal(index.director_movies, [20, 10, 30])
+
+
+def test_lookups(index):
+    np.testing.assert_array_equal(index.movies_for(5, "cast"), [10, 20, 30])
+    np.testing.assert_array_equal(index.movies_for(9, "director"), [10, 30])
+    np.testing.assert_array_equal(index.movies_for(9, "cast"), [])
+    unknown = index.movies_for(999, "cast")
+    assert len(unknown) == 0 and unknown.dtype == np.int32
+    assert index.name_of(5) == "Ann"
+    assert index.name_of(999) == "999"
+    np.testing.assert_array_equal(index.ranked_people("cast"), [5, 3, 7])
+    np.testing.assert_array_equal(index.ranked_people("cast", min_movies=2), [5])
+
+
+def test_person_roi_leaderboard(index):
+    df = pd.DataFrame({
+        "id": [10, 20, 30, 30, 50],
+        "roi": [1.0, 3.0, 8.0, 8.0, 100.0],
+    })
+    board = person_roi_leaderboard(df, index, "cast", min_movies=1)
+    assert board["name"].tolist() == ["Cid", "Ann", "Bo"]
+    assert board["movies"].tolist() == [1, 3, 1]
+    assert board["median_roi"].tolist() == [8.0, 3.0, 1.0]
+    np.testing.assert_allclose(board["mean_roi"], [8.0, 4.0, 1.0])
+
+    assert person_roi_leaderboard(df, index, "cast", min_movies=2)["name"].tolist() == ["Ann"]
+    # Movies outside ``df`` (40) and without ROI do not count
+    directors = person_roi_leaderboard(df.assign(roi=[np.nan, 3.0, 8.0, 8.0, 1.0]), index, "director", min_movies=1)
+    assert directors["name"].tolist() == ["Dee", "Bo"]
+    assert directors["movies"].tolist() == [1, 1]
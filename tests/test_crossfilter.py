@@ -0,0 +1,56 @@
+"""Chart cross-filter rows must match a row-by-row reference, with object and Arrow list columns."""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from crossfilter import GENRE, CrossFilter, CrossView, cross_filter_mask
+from filters import filter_mask
+from lru import LRUCache
+
+SELECTIONS = [
+    CrossFilter(genres=("Drama",)),
+    CrossFilter(genres=("Horror", "War")),
+    CrossFilter(cells=(("France", "fr"),)),
+    CrossFilter(cells=(("United States of America", "en"), ("Japan", "ja"))),
+    CrossFilter(genres=("Comedy",), cells=(("United Kingdom", "en"),)),
+    # Matches nothing: no movie has this (country, language) cell
+    CrossFilter(cells=(("France", "zz"),)),
+]
+
+
+def _reference(df, xf):
+    keep = []
+    for genres, countries, language in zip(df["genres_list"], df["production_countries_list"], df["original_language"]):
+        ok = not xf.genres or any(g in xf.genres for g in genres)
+        ok = ok and (not xf.cells or any((c, language) in xf.cells for c in countries))
+        keep.append(ok)
+    return np.array(keep, dtype=bool)
+
+
+@pytest.fixture(scope="module", params=["object", "arrow"])
+def table(request, movies):
+    if request.param == "object":
+        return movies
+    # Shared-table mode: list columns are Arrow list<string>
+    list_type = pd.ArrowDtype(pa.list_(pa.string()))
+    return movies.astype({"genres_list": list_type, "production_countries_list": list_type})
+
+
+def test_fixture_has_empty_lists(movies):
+    assert (movies["genres_list"].map(len) == 0).any()
+    assert (movies["production_countries_list"].map(len) == 0).any()
+
+
+@pytest.mark.parametrize("xf", SELECTIONS)
+def test_mask_matches_reference(table, movies, xf):
+    np.testing.assert_array_equal(cross_filter_mask(table, xf), _reference(movies, xf))
+
+
+@pytest.mark.parametrize("xf", SELECTIONS)
+def test_positions_apply_sidebar_then_selection(table, movies, make_filters, xf):
+    f = make_filters(movies, years=(1960, 2010))
+    view = CrossView(df_full=table, version=1, f=f, xf=xf, memo=LRUCache(2**30))
+    sidebar = filter_mask(movies, f).to_numpy()
+    np.testing.assert_array_equal(view.positions(), np.flatnonzero(sidebar & _reference(movies, xf)))
+    np.testing.assert_array_equal(view.positions(exclude=GENRE), np.flatnonzero(sidebar & _reference(movies, xf.without(GENRE))))
@@ -0,0 +1,10 @@
+"""The load-test harness must drive a real server without errors of its own."""
+from loadtest import AppServer, run_level, write_synthetic_dataset
+
+
+def test_run_level_has_no_errors(tmp_path):
+    write_synthetic_dataset(str(tmp_path), 2000, seed=0)
+    with AppServer(str(tmp_path)) as server:
+        result = run_level(4, 2, server=server)
+    assert result.errors == 0
+    assert result.reruns > 0
@@ -0,0 +1,41 @@
+"""Byte- and entry-bounded LRU shared by the spec cache and the aggregate memo."""
+from lru import LRUCache
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    assert cache.get("a") == "xxxx"
+    cache.put("c", "xxxx")
+    assert cache.get("b") is None
+    assert cache.get("a") == "xxxx" and cache.get("c") == "xxxx"
+    stats = cache.stats()
+    assert (stats.entries, stats.nbytes, stats.evictions) == (2, 8, 1)
+    assert (stats.hits, stats.misses) == (3, 1)
+    assert stats.hit_rate == 0.75
+
+
+def test_entry_bound_oversize_values_and_replacement():
+    cache = LRUCache(max_bytes=100, max_entries=2, sizeof=len)
+    cache.put("big", "x" * 101)
+    assert cache.get("big") is None
+    for key in ("a", "b", "c"):
+        cache.put(key, "xx")
+    assert cache.get("a") is None
+    cache.put("b", "xxxxx")
+    stats = cache.stats()
+    assert (stats.entries, stats.nbytes) == (2, 7)
+
+
+def test_get_or_compute_runs_once_and_caches_falsy_values():
+    cache = LRUCache(max_bytes=100)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 0
+
+    assert cache.get_or_compute("k", compute) == 0
+    assert cache.get_or_compute("k", compute) == 0
+    assert len(calls) == 1
@@ -0,0 +1,54 @@
+"""Merged partition statistics must match filtering the rows and computing the statistics directly."""
+import numpy as np
+import pytest
+
+from filters import apply_filters
+from moments import build_moment_stats
+
+HEATMAP_COLUMNS = ["budget", "revenue", "runtime", "popularity", "vote_average", "vote_count", "profit", "roi"]
+
+
+@pytest.fixture(scope="module")
+def stats(movies):
+    return build_moment_stats(movies)
+
+
+PARTITION_FILTERS = [
+    {},
+    {"exclude_zero_revenue": False},
+    {"years": (1980, 2005)},
+    {"genres": ["Drama", "Comedy"]},
+    {"languages": ["en", "fr"], "years": (1960, 2010)},
+    {"genres": ["Action"], "languages": ["en"], "exclude_zero_revenue": False},
+]
+
+
+@pytest.mark.parametrize("overrides", PARTITION_FILTERS)
+def test_query_matches_exact_path(movies, stats, make_filters, overrides):
+    f = make_filters(movies, **overrides)
+    moments = stats.query(f)
+    assert moments is not None, "partition-only filter not covered"
+    sub = apply_filters(movies, f)
+    assert len(sub) > 0
+    assert moments.n_rows == len(sub)
+
+    expected = sub[HEATMAP_COLUMNS].corr()
+    np.testing.assert_allclose(moments.corr_matrix(HEATMAP_COLUMNS).to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
+
+    for col in ("vote_average", "revenue", "roi"):
+        np.testing.assert_allclose(moments.mean(col), sub[col].mean(), rtol=1e-9)
+
+    np.testing.assert_allclose(
+        moments.corr("budget_clip", "revenue_clip"), sub[["budget_clip", "revenue_clip"]].corr().iloc[0, 1], rtol=1e-9
+    )
+    sub_b = sub.dropna(subset=["budget_clip", "vote_average"]).query("budget_clip > 0")
+    np.testing.assert_allclose(
+        moments.corr("log_budget_clip", "vote_average"),
+        np.corrcoef(np.log1p(sub_b["budget_clip"]), sub_b["vote_average"])[0, 1],
+        rtol=1e-9,
+    )
+
+
+@pytest.mark.parametrize("overrides", [{"title_kw": "ii"}, {"roi_min": 1.0}, {"vote_range": (6.0, 10.0)}])
+def test_row_filters_not_covered(movies, stats, make_filters, overrides):
+    assert stats.query(make_filters(movies, **overrides)) is None
@@ -0,0 +1,104 @@
+"""The memory-mapped table must filter like the pandas path and round-trip the moment statistics."""
+import dataclasses
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import credits
+from credits import build_credits_index
+from filters import filter_mask
+from moments import build_moment_stats
+from shared_table import attach_moments, attach_table, publish_table
+
+FILTERS = [
+    {},
+    {"exclude_zero_revenue": False},
+    {"years": (1980, 2005)},
+    {"genres": ["Drama", "Comedy"]},
+    {"genres": ["Science Fiction"], "exclude_zero_revenue": False},
+    {"languages": ["en", "fr"]},
+    {"languages": ["zz"]},
+    {"vote_range": (6.0, 7.5)},
+    {"runtime_range": (90.0, 120.0)},
+    {"roi_min": 1.5},
+    {"min_votes": 500},
+    {"title_kw": "ii"},
+    {"title_kw": "movie 1[0-9]$"},
+    # Lookahead: Python ``re`` only (RE2 has no lookarounds)
+    {"title_kw": "movie (?!1)"},
+    # Not a valid pattern: matched as plain text
+    {"title_kw": "ii ("},
+    {"person_id": 101, "person_role": "cast"},
+    {"person_id": 201, "person_role": "director"},
+    {"person_id": 999, "person_role": "cast"},
+]
+
+
+@pytest.fixture(scope="module")
+def published(movies, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("shared") / "movies.arrow")
+    stats = build_moment_stats(movies)
+    version = publish_table(movies, path, source="synthetic", moments=stats)
+    return path, version, stats
+
+
+@pytest.fixture(scope="module")
+def shared(published):
+    return attach_table(published[0])
+
+
+@pytest.fixture()
+def credits_index(movies, monkeypatch):
+    """Small credits index over the synthetic movie ids, used by the person filter of both paths."""
+    ids = movies["id"].to_numpy()
+    raw = pd.DataFrame({
+        "movie_id": ids,
+        "cast": [json.dumps([{"id": 100 + (i % 3), "name": f"Actor {i % 3}"}]) for i in range(len(ids))],
+        "crew": [json.dumps([{"id": 200 + (i % 7), "name": f"Director {i % 7}", "job": "Director"}]) for i in range(len(ids))],
+    })
+    index = build_credits_index(raw)
+    monkeypatch.setattr(credits, "load_credits_index", lambda: index)
+    return index
+
+
+@pytest.mark.parametrize("overrides", FILTERS)
+def test_filter_mask_matches_pandas(movies, shared, make_filters, credits_index, overrides):
+    f = make_filters(movies, **overrides)
+    expected = filter_mask(movies, f).to_numpy()
+    np.testing.assert_array_equal(shared.filter_mask(f), expected)
+    # The worker's frame (Arrow-backed text and list columns) filters the same way with pandas
+    np.testing.assert_array_equal(filter_mask(shared.to_pandas(), f).to_numpy(), expected)
+
+
+def test_lookahead_keyword_matches_rows(movies, shared, make_filters):
+    f = make_filters(movies, title_kw="movie (?!1)")
+    assert 0 < shared.filter_mask(f).sum() < len(movies)
+
+
+def test_moments_round_trip(published):
+    path, version, stats = published
+    attached = attach_moments(path, version)
+    assert attached is not None
+    for field in dataclasses.fields(stats):
+        expected, actual = getattr(stats, field.name), getattr(attached, field.name)
+        if isinstance(expected, np.ndarray):
+            np.testing.assert_array_equal(actual, expected, err_msg=field.name)
+            assert actual.dtype.kind == expected.dtype.kind, field.name
+        else:
+            assert actual == expected, field.name
+
+
+def test_moments_of_another_version_are_ignored(published, tmp_path):
+    path, version, _ = published
+    assert attach_moments(path, version + 1) is None
+    assert attach_moments(str(tmp_path / "missing.arrow"), version) is None
+
+
+def test_shared_frame_matches_source(movies, shared):
+    frame = shared.to_pandas()
+    assert sorted(frame.columns) == sorted(movies.columns)
+    for col in ("budget", "revenue", "roi", "vote_average", "release_year"):
+        np.testing.assert_array_equal(frame[col].to_numpy(dtype=float), movies[col].to_numpy(dtype=float))
+    assert [list(g) for g in frame["genres_list"]] == [list(g) for g in movies["genres_list"]]
@@ -0,0 +1,8 @@
+"""Time-to-first-paint budget (``STARTUP_BUDGET_S``) and deferred imports, measured like ``startup.py``."""
+from startup import STARTUP_BUDGET_S, measure_first_paint
+
+
+def test_first_paint_within_budget():
+    fp = measure_first_paint()
+    assert fp.early_imports == [], f"deferred modules imported before first paint: {fp.early_imports}"
+    assert fp.seconds <= STARTUP_BUDGET_S, f"first paint {fp.seconds:.3f} s over budget {STARTUP_BUDGET_S:.3f} s"